@@ -0,0 +1,31 @@
+import contextlib
+import os
+import threading
+
+@contextlib.contextmanager
+def atomic_open(path, mode='w', durable=False):
+    """Open a temporary file next to path and move it over path once the block succeeds.
+
+    Readers see the old file or the new one, never half of one, and a failed write leaves
+    path untouched. durable=True also fsyncs the data before the rename, for state that
+    must survive a crash of the machine, not just of the process.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    encoding = None if 'b' in mode else 'utf-8'
+    try:
+        with open(temporary_path, mode, encoding=encoding) as f:
+            yield f
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+        raise
+
+def atomic_write(path, data, durable=False):
+    """Replace path with data (str or bytes) through atomic_open."""
+    with atomic_open(path, 'wb' if isinstance(data, bytes) else 'w', durable=durable) as f:
+        f.write(data)
@@ -0,0 +1,58 @@
+import hashlib
+import json
+
+from atomic_file import atomic_write
+from disk_cache import DiskCache
+
+def make_cache_key(model_id, max_tokens, temperature, top_p, prompt):
+    """Content address of a Bedrock request: the hash of the model, inference parameters and prompt."""
+    payload = json.dumps(
+        {
+            'model_id': model_id,
+            'max_tokens': max_tokens,
+            'temperature': temperature,
+            'top_p': top_p,
+            'prompt': prompt
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class BedrockResponseCache(DiskCache):
+    """On-disk cache of Bedrock completions, evicted least-recently-used by total size.
+
+    Each entry is a small JSON file holding the raw completion and, when it could be
+    parsed, the extracted JSON.
+    """
+
+    SUFFIXES = ('.json',)
+
+    def __init__(self, directory, max_bytes):
+        super().__init__(directory, max_bytes, counters=('hits', 'misses', 'writes'))
+
+    def get(self, key):
+        """Return the cached {'completion', 'parsed'} entry for key, or None."""
+        try:
+            with open(self._paths(key)[0], 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self._count('misses')
+            return None
+
+        self._touch(key)
+        self._count('hits')
+        return entry
+
+    def put(self, key, completion, parsed=None):
+        """Store a completion (and its parsed JSON, if any) and evict old entries over the size limit."""
+        data = json.dumps({'completion': completion, 'parsed': parsed}).encode('utf-8')
+        atomic_write(self._paths(key)[0], data)
+        self._count('writes')
+        self._stored(key, len(data))
+
+    def report(self):
+        """Return hit/miss counters plus the current entry count and size."""
+        report = super().report()
+        lookups = report['hits'] + report['misses']
+        report['hit_rate'] = round(report['hits'] / lookups, 3) if lookups else 0.0
+        return report
@@ -0,0 +1,93 @@
+import threading
+import time
+
+from metrics import metrics
+
+def estimate_tokens(text):
+    """Rough token count for Claude models (about four characters per token)."""
+    return max(1, len(text) // 4)
+
+class BedrockGovernor:
+    """Shared rate and concurrency limiter for every Bedrock caller.
+
+    Tokens are drawn from a bucket that refills at the current tokens-per-minute rate, and
+    at most `limit` requests may be in flight. Both follow AIMD: a throttle halves the
+    concurrency limit, cuts the rate and empties the bucket; each success grows them back
+    a little, up to the configured ceilings.
+    """
+
+    def __init__(self, tokens_per_minute, max_concurrency, min_concurrency=1, min_tokens_per_minute=None):
+        self.max_tokens_per_minute = tokens_per_minute
+        self.min_tokens_per_minute = min_tokens_per_minute or tokens_per_minute / 10
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.tokens = float(tokens_per_minute)
+        self.last_refill = time.monotonic()
+        self.stats = {'requests': 0, 'throttles': 0, 'tokens': 0, 'wait_seconds': 0.0}
+        self.condition = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(
+            self.tokens_per_minute,
+            self.tokens + (now - self.last_refill) * self.tokens_per_minute / 60
+        )
+        self.last_refill = now
+
+    def acquire(self, estimated_tokens):
+        """Block until a concurrency slot and enough tokens are available, then take them."""
+        # A single request can never need more than a full bucket
+        needed = min(estimated_tokens, self.max_tokens_per_minute)
+        start = time.monotonic()
+
+        with self.condition:
+            while True:
+                self._refill()
+                if self.in_flight < int(self.limit) and self.tokens >= min(needed, self.tokens_per_minute):
+                    break
+                # Sleep until the bucket should hold enough tokens, or a slot frees up
+                missing = max(0.0, needed - self.tokens)
+                self.condition.wait(timeout=max(0.05, missing * 60 / self.tokens_per_minute))
+
+            self.tokens -= needed
+            self.in_flight += 1
+            self.stats['requests'] += 1
+            self.stats['wait_seconds'] += time.monotonic() - start
+        metrics.observe('bedrock_governor_wait', time.monotonic() - start)
+        return needed
+
+    def release(self, reserved_tokens, used_tokens=None, throttled=False):
+        """Return a slot, settle the token reservation and adapt the limits."""
+        with self.condition:
+            self.in_flight -= 1
+
+            if throttled:
+                self.stats['throttles'] += 1
+                self.limit = max(self.min_concurrency, self.limit / 2)
+                self.tokens_per_minute = max(self.min_tokens_per_minute, self.tokens_per_minute * 0.7)
+                self.tokens = 0.0
+            else:
+                if used_tokens is not None:
+                    # Refund (or charge) the difference between the estimate and the real usage
+                    self.tokens += reserved_tokens - used_tokens
+                    self.stats['tokens'] += used_tokens
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                self.tokens_per_minute = min(
+                    self.max_tokens_per_minute,
+                    self.tokens_per_minute + self.max_tokens_per_minute * 0.02
+                )
+
+            self.condition.notify_all()
+
+    def report(self):
+        """Return a snapshot of the current limits and counters."""
+        with self.condition:
+            return dict(
+                self.stats,
+                concurrency_limit=int(self.limit),
+                tokens_per_minute=int(self.tokens_per_minute),
+                in_flight=self.in_flight
+            )
@@ -0,0 +1,165 @@
+"""End-to-end throughput of the main actions against local stand-ins for YouTube and AWS.
+
+Runs get_playlist_details, generate_summary, update_view_count and upload_summary in
+order, as a daily run would, with recorded (or synthetic) YouTube pages and transcripts,
+an in-memory DynamoDB table and S3 bucket, and a Bedrock fake with a configurable
+latency and throttle rate. Reports items/sec and peak Python memory per action.
+
+Usage:
+    python benchmarks/bench_actions.py [--videos N] [--recording DIR] [--bedrock-throttle-rate R]
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fakes
+
+class ScaledTime:
+    """The time module with sleep() scaled, to shorten the tool's politeness delays."""
+
+    def __init__(self, scale):
+        self.scale = scale
+
+    def sleep(self, seconds):
+        time.sleep(seconds * self.scale)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+def install_fakes(y, args, recording):
+    """Point the tool's module-level clients at the stand-ins; returns them by name."""
+    table = fakes.FakeTable(indexes={
+        y.EVENT_YEAR_INDEX: ('event_year', ('upload_date', 'view_count')),
+        y.NEEDS_SUMMARY_INDEX: ('needs_summary', 'KEYS_ONLY')
+    }, latency=args.dynamodb_latency)
+    youtube = fakes.RecordedYouTube(recording, y.CHANNEL_PATH, latency=args.youtube_latency)
+    transcripts = fakes.RecordedTranscripts(recording, latency=args.transcript_latency)
+    s3 = fakes.FakeS3(latency=args.s3_latency)
+    bedrock = fakes.FakeBedrock(args.bedrock_latency, args.bedrock_token_latency, args.bedrock_throttle_rate)
+
+    y.table = y.write_buffer.table = table
+    y.dynamodb = fakes.FakeDynamoDB({y.TABLE_NAME: table})
+    y.s3_client = s3
+    y.bedrock_client = bedrock
+    y.youtube_client = youtube
+    y.get_youtube_client = lambda host: youtube
+    y.YouTubeTranscriptApi = transcripts
+    y.time = ScaledTime(args.sleep_scale)
+    y.CRAWL_PAGE_DELAY *= args.sleep_scale
+    y.bedrock_governor = y.BedrockGovernor(args.bedrock_tpm or y.BEDROCK_TOKENS_PER_MINUTE, y.BEDROCK_MAX_CONCURRENCY)
+    if args.revalidate:
+        # Every cached watch page is stale, so update_view_count sends conditional requests
+        y.VIEW_COUNT_REFRESH_POLICY = [(None, 0)]
+    return {'table': table, 'youtube': youtube, 'transcripts': transcripts, 's3': s3, 'bedrock': bedrock}
+
+def run_actions(y, stand_ins, verbose, measure_memory):
+    table, s3 = stand_ins['table'], stand_ins['s3']
+
+    def summarized():
+        return sum(1 for item in table.items.values() if item.get('customer_names'))
+
+    def ingest():
+        return y.ingest_channel_videos("re:Invent", "2024")['store']['processed']
+
+    def summarize():
+        before = summarized()
+        y.generate_summary()
+        return summarized() - before
+
+    def view_counts():
+        counts = y.get_video_urls()
+        return counts['refreshed'] + counts['failed']
+
+    def upload():
+        before = len(s3.keys(y.SUMMARY_S3_PREFIX))
+        y.process_dynamodb_and_upload_with_summary()
+        return len(s3.keys(y.SUMMARY_S3_PREFIX)) - before
+
+    actions = [
+        ('get_playlist_details', ingest),
+        ('generate_summary', summarize),
+        ('update_view_count', view_counts),
+        ('upload_summary', upload)
+    ]
+
+    results = []
+    for name, action in actions:
+        y.metrics.reset()
+        if measure_memory:
+            tracemalloc.start()
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        start = time.perf_counter()
+        with output:
+            items = action()
+        elapsed = time.perf_counter() - start
+        peak = 0
+        if measure_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        results.append((name, items, elapsed, peak))
+        if verbose:
+            print(y.metrics.format_summary(name))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--videos', type=int, default=100, help="re:Invent talks in the synthetic recording")
+    parser.add_argument('--transcript-minutes', type=int, default=30, help="average talk length of the synthetic recording")
+    parser.add_argument('--recording', help="directory of recorded pages and transcripts (see benchmarks/fakes.py) "
+                                            "instead of a synthetic one")
+    parser.add_argument('--youtube-latency', type=float, default=0.05, help="seconds per YouTube page")
+    parser.add_argument('--transcript-latency', type=float, default=0.1, help="seconds per transcript download")
+    parser.add_argument('--dynamodb-latency', type=float, default=0.005, help="seconds per DynamoDB call")
+    parser.add_argument('--s3-latency', type=float, default=0.02, help="seconds per S3 call")
+    parser.add_argument('--bedrock-latency', type=float, default=0.5, help="seconds per Bedrock call before generation")
+    parser.add_argument('--bedrock-token-latency', type=float, default=0.0005, help="seconds per generated token")
+    parser.add_argument('--bedrock-throttle-rate', type=float, default=0.0, help="share of Bedrock calls throttled")
+    parser.add_argument('--bedrock-tpm', type=int, default=0, help="tokens-per-minute quota the governor paces to "
+                                                                    "(default: BEDROCK_TOKENS_PER_MINUTE)")
+    parser.add_argument('--sleep-scale', type=float, default=0.0, help="factor applied to the tool's fixed sleeps "
+                                                                       "(1 = real page delays)")
+    parser.add_argument('--revalidate', action='store_true', help="treat every cached watch page as stale in update_view_count")
+    parser.add_argument('--no-memory', action='store_true', help="skip tracemalloc, which slows Python code down")
+    parser.add_argument('--verbose', action='store_true', help="show the tool's output and each action's run report")
+    args = parser.parse_args()
+
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+    workdir = tempfile.mkdtemp(prefix='bench_actions_')
+    try:
+        recording = args.recording
+        if not recording:
+            recording = os.path.join(workdir, 'recording')
+            talks = fakes.write_synthetic_recording(recording, args.videos, transcript_minutes=args.transcript_minutes)
+            print(f"Synthetic recording: {talks} talks of about {args.transcript_minutes} minutes")
+        recording = os.path.abspath(recording)
+
+        # Caches, checkpoints, crawl state and the log file are relative paths: keep them in the work directory
+        os.chdir(workdir)
+        import youtube_ai_assistant as y
+        stand_ins = install_fakes(y, args, recording)
+
+        results = run_actions(y, stand_ins, args.verbose, not args.no_memory)
+
+        print(f"{'action':<22} {'items':>7} {'seconds':>9} {'items/s':>9} {'peak MB':>9}")
+        for name, items, elapsed, peak in results:
+            rate = items / elapsed if elapsed > 0 else 0.0
+            memory = f"{peak / 1e6:>9.1f}" if not args.no_memory else f"{'-':>9}"
+            print(f"{name:<22} {items:>7} {elapsed:>9.2f} {rate:>9.2f} {memory}")
+        for name, stand_in in stand_ins.items():
+            print(f"{name}: {stand_in.stats}")
+    finally:
+        os.chdir(REPO)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
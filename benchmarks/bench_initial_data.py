@@ -0,0 +1,106 @@
+"""Micro-benchmark of ytInitialData extraction over saved YouTube pages.
+
+Usage:
+    python benchmarks/bench_initial_data.py [PAGES_DIR] [--repeat N]
+
+PAGES_DIR holds saved channel, playlist and watch pages (*.html), e.g. saved with
+`curl -s https://www.youtube.com/@AWSEventsChannel/videos > pages/channel.html`.
+When no directory is given, or it holds no pages, synthetic pages of similar size are used.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from youtube_pages import extract_initial_data
+
+# The extraction the tool used before youtube_pages.extract_initial_data
+LEGACY_PATTERN = r'var ytInitialData = ({.*?});'
+
+def legacy_extract(html_content):
+    match = re.search(LEGACY_PATTERN, html_content)
+    if match:
+        try:
+            return json.loads(match.group(1))
+        except json.JSONDecodeError:
+            return None
+    return None
+
+def synthetic_page(kind, videos, tricky_titles=True):
+    """Build a page shaped like a YouTube page, optionally with '};' inside title strings."""
+    items = [
+        {
+            'richItemRenderer': {
+                'content': {
+                    'videoRenderer': {
+                        'videoId': f"vid{n:07d}",
+                        'title': {'runs': [{'text': f"AWS re:Invent 2024 - Session {n}" + (" (code: if (x) { y(); };)" if tricky_titles else "")}]},
+                        'descriptionSnippet': {'runs': [{'text': "lorem ipsum " * 20}]}
+                    }
+                }
+            }
+        }
+        for n in range(videos)
+    ]
+    data = {'contents': {'twoColumnBrowseResultsRenderer': {'tabs': [{'tabRenderer': {'selected': True, 'content': {'richGridRenderer': {'contents': items}}}}]}}}
+    padding = "<script>var filler = '" + "x" * 200000 + "';</script>"
+    return (
+        f"<html><head><title>{kind}</title>{padding}</head><body>"
+        f"<script>var ytInitialData = {json.dumps(data)};</script>"
+        f"{padding}<script>var ytInitialPlayerResponse = {{\"videoDetails\": {{}}}};</script></body></html>"
+    )
+
+def load_corpus(pages_dir):
+    pages = {}
+    if pages_dir:
+        for path in sorted(glob.glob(os.path.join(pages_dir, '*.html'))):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages[os.path.basename(path)] = f.read()
+    if not pages:
+        pages = {
+            'synthetic_channel.html': synthetic_page('channel', 3000),
+            'synthetic_playlist.html': synthetic_page('playlist', 1500),
+            'synthetic_watch.html': synthetic_page('watch', 200),
+            'synthetic_channel_plain.html': synthetic_page('channel', 3000, tricky_titles=False),
+            'synthetic_playlist_plain.html': synthetic_page('playlist', 1500, tricky_titles=False)
+        }
+    return pages
+
+def time_call(func, html_content, repeat):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(html_content)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages_dir', nargs='?', help="directory of saved *.html pages")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per page (best time is reported)")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.pages_dir)
+    print(f"{'page':<32} {'size':>9} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}  legacy ok  new ok")
+    totals = [0.0, 0.0]
+
+    for name, html_content in pages.items():
+        legacy_time, legacy_result = time_call(legacy_extract, html_content, args.repeat)
+        new_time, new_result = time_call(extract_initial_data, html_content, args.repeat)
+        totals[0] += legacy_time
+        totals[1] += new_time
+        speedup = legacy_time / new_time if new_time else float('inf')
+        print(f"{name:<32} {len(html_content) / 1e6:>7.2f}MB {legacy_time * 1000:>10.2f} {new_time * 1000:>8.2f} "
+              f"{speedup:>7.1f}x  {str(legacy_result is not None):>9}  {str(new_result is not None):>6}")
+
+    print(f"{'total':<42} {totals[0] * 1000:>10.2f} {totals[1] * 1000:>8.2f} "
+          f"{totals[0] / totals[1] if totals[1] else float('inf'):>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Query latency of the local search index on a synthetic corpus of talks.
+
+Usage:
+    python benchmarks/bench_search.py [--talks N] [--passages N] [--queries N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from search_index import PASSAGE_WORDS, SearchIndex
+
+SERVICES = "s3 lambda dynamodb bedrock sagemaker kinesis redshift aurora eks ecs fargate glue athena".split()
+
+def vocabulary(size, seed=0):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    return sorted(words) + SERVICES
+
+def synthetic_talks(count, passages, words, seed=0):
+    """Yield (video_url, passages) with Zipf-like word frequencies, like spoken English."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    for n in range(count):
+        texts = rng.choices(words, weights=weights, k=passages * PASSAGE_WORDS)
+        yield f"https://www.youtube.com/watch?v=talk{n:06d}", [
+            ('transcript', i * 20, " ".join(texts[i * PASSAGE_WORDS:(i + 1) * PASSAGE_WORDS]))
+            for i in range(passages)
+        ]
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--talks', type=int, default=20000, help="number of talks in the corpus")
+    parser.add_argument('--passages', type=int, default=40, help=f"passages of {PASSAGE_WORDS} words per talk")
+    parser.add_argument('--queries', type=int, default=200, help="queries per query type")
+    args = parser.parse_args()
+
+    words = vocabulary(50000)
+    index = SearchIndex()
+    start = time.perf_counter()
+    for video_url, passages in synthetic_talks(args.talks, args.passages, words):
+        index.add_video(video_url, video_url, passages)
+    build_time = time.perf_counter() - start
+    print(f"Indexed {args.talks} talks ({len(index.passage_video)} passages, {len(index.postings)} terms) "
+          f"in {build_time:.1f}s")
+
+    rng = random.Random(1)
+    common, rare = words[:500], words[5000:]
+
+    def corpus_phrase(size):
+        # Users look up phrases that occur in talks, so take one from a random passage
+        text = index.passage_text[rng.randrange(len(index.passage_text))].split()
+        start = rng.randrange(len(text) - size)
+        return '"%s"' % " ".join(text[start:start + size])
+
+    query_types = {
+        'rare word': lambda: rng.choice(rare),
+        'common word': lambda: rng.choice(common),
+        '3 words': lambda: " ".join(rng.choice(common[:200] + rare) for _ in range(3)),
+        'phrase': lambda: corpus_phrase(2),
+        'long phrase': lambda: corpus_phrase(4),
+        'service': lambda: rng.choice(SERVICES) + " " + rng.choice(rare),
+        'common phrase': lambda: '"%s"' % " ".join(rng.choice(common[:50]) for _ in range(2)),
+    }
+
+    print(f"{'query':<14} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'avg hits':>9}")
+    for name, make_query in query_types.items():
+        latencies = []
+        hits = 0
+        for _ in range(args.queries):
+            query = make_query()
+            start = time.perf_counter()
+            hits += len(index.search(query, k=10))
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<14} {percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.95):>8.2f} "
+              f"{percentile(latencies, 0.99):>8.2f} {hits / args.queries:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark of transcript formatting on synthetic 1-3 hour talks.
+
+Usage:
+    python benchmarks/bench_transcript.py [--repeat N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from transcript_model import Transcript
+
+WORDS = "so today we are going to talk about how amazon s3 and aws lambda scale our data platform".split()
+
+def synthetic_transcript(hours, seed=0):
+    """Caption entries roughly every 2-4 seconds, with a sentence ending every few entries."""
+    rng = random.Random(seed)
+    entries = []
+    start = 0.0
+    while start < hours * 3600:
+        duration = rng.uniform(2.0, 4.0)
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 12)))
+        if rng.random() < 0.3:
+            text += "."
+        entries.append({'text': text, 'start': round(start, 3), 'duration': round(duration, 3)})
+        start += duration
+    return entries
+
+def legacy_render(transcript):
+    """The formatting process_youtube_url used before the Transcript model."""
+    transcript_data = "start - text\n"
+    for entry in transcript:
+        start_seconds = entry['start']
+        minutes = int(start_seconds // 60)
+        seconds = round(start_seconds % 60, 2)
+        start_time = f"{minutes:02}:{int(seconds):02}"
+        transcript_data += f"{start_time} - \"{entry['text']}\"\n"
+
+    sentences = []
+    current_sentence = []
+    for entry in transcript:
+        current_sentence.append(entry["text"])
+        if entry["text"].endswith("."):
+            sentences.append(" ".join(current_sentence).replace("\n", " "))
+            current_sentence = []
+    if current_sentence:
+        sentences.append(" ".join(current_sentence).replace("\n", " "))
+    return transcript_data, "\n".join(sentences)
+
+def best_time(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="runs per size (best time is reported)")
+    args = parser.parse_args()
+
+    print(f"{'length':<8} {'entries':>8} {'legacy ms':>10} {'model ms':>9} {'speedup':>8}  same output")
+    for hours in (1, 2, 3):
+        entries = synthetic_transcript(hours, seed=hours)
+        legacy_time, legacy_result = best_time(lambda: legacy_render(entries), args.repeat)
+        model_time, model_result = best_time(lambda: Transcript.from_entries(entries).render(), args.repeat)
+        same = legacy_result == model_result[:2]
+        print(f"{hours}h{'':<6} {len(entries):>8} {legacy_time * 1000:>10.2f} {model_time * 1000:>9.2f} "
+              f"{legacy_time / model_time:>7.1f}x  {same}")
+
+if __name__ == '__main__':
+    main()
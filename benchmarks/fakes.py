@@ -0,0 +1,466 @@
+"""Local stand-ins for YouTube, DynamoDB, S3 and Bedrock used by the offline benchmarks.
+
+Each fake implements just the calls the tool makes, keeps call counters in `stats` and
+can add a fixed latency per call, so a benchmark measures the tool's own overheads and
+concurrency rather than the network.
+"""
+import bisect
+import hashlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+
+from youtube_http import Response
+
+def _pause(seconds):
+    if seconds > 0:
+        time.sleep(seconds)
+
+class _Counters:
+    def __init__(self, *names):
+        self.lock = threading.Lock()
+        self.stats = {name: 0 for name in names}
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] = self.stats.get(name, 0) + amount
+
+# ---------------------------------------------------------------------------- DynamoDB
+
+def _names(expression, names):
+    return [names.get(part.strip(), part.strip()) for part in expression.split(',') if part.strip()]
+
+def _condition(expression, names, values):
+    """Compile the subset of condition expressions the tool uses (=, attribute_(not_)exists, AND)."""
+    tests = []
+    for term in re.split(r'\s+AND\s+', expression.strip()):
+        match = re.fullmatch(r'(attribute_not_exists|attribute_exists)\((\S+)\)', term.strip())
+        if match:
+            name = names.get(match.group(2), match.group(2))
+            tests.append((lambda item, name=name: name not in item) if match.group(1) == 'attribute_not_exists'
+                         else (lambda item, name=name: name in item))
+            continue
+        match = re.fullmatch(r'(\S+)\s*=\s*(:\w+)', term.strip())
+        if not match:
+            raise NotImplementedError(f"Condition not supported by the fake table: {term}")
+        name, value = names.get(match.group(1), match.group(1)), values[match.group(2)]
+        tests.append(lambda item, name=name, value=value: item.get(name) == value)
+    return lambda item: all(test(item) for test in tests)
+
+def _item_size(item):
+    return sum(len(name) + (len(value) if isinstance(value, (str, bytes)) else len(json.dumps(value, default=str)))
+               for name, value in item.items())
+
+class FakeTable:
+    """In-memory DynamoDB table with segmented scans, queries on secondary indexes and updates.
+
+    indexes maps an index name to (key attribute, projection), where projection is 'ALL',
+    'KEYS_ONLY' or a tuple of included attributes; items without the index key are left
+    out (sparse index). Pages stop at about 1 MB of item data, like DynamoDB's.
+    """
+
+    PAGE_BYTES = 1024 * 1024
+
+    def __init__(self, key_name='video_url', indexes=None, latency=0.0):
+        self.key_name = key_name
+        self.indexes = indexes or {}
+        self.latency = latency
+        self.items = {}
+        self.lock = threading.Lock()
+        self.counters = _Counters('get_item', 'update_item', 'scan', 'query', 'batch_get_item')
+
+    @property
+    def stats(self):
+        return self.counters.stats
+
+    def _project(self, item, kwargs):
+        if 'ProjectionExpression' not in kwargs:
+            return dict(item)
+        wanted = _names(kwargs['ProjectionExpression'], kwargs.get('ExpressionAttributeNames', {}))
+        return {name: item[name] for name in wanted if name in item}
+
+    def get_item(self, Key, **kwargs):
+        self.counters.count('get_item')
+        _pause(self.latency)
+        with self.lock:
+            item = self.items.get(Key[self.key_name])
+            return {'Item': self._project(item, kwargs)} if item is not None else {}
+
+    def update_item(self, Key, UpdateExpression, ExpressionAttributeNames=None, ExpressionAttributeValues=None, **kwargs):
+        self.counters.count('update_item')
+        _pause(self.latency)
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+        clauses = dict(re.findall(r'(SET|REMOVE)\s+(.*?)(?=\s+(?:SET|REMOVE)\s+|$)', UpdateExpression.strip()))
+        with self.lock:
+            item = self.items.setdefault(Key[self.key_name], dict(Key))
+            for assignment in clauses.get('SET', '').split(','):
+                if assignment.strip():
+                    name, value = (part.strip() for part in assignment.split('='))
+                    item[names.get(name, name)] = values[value]
+            for name in _names(clauses.get('REMOVE', ''), names):
+                item.pop(name, None)
+        return {}
+
+    def _page(self, keys, kwargs, matches):
+        # Read keys from ExclusiveStartKey on until about a megabyte of items was read
+        start = 0
+        if 'ExclusiveStartKey' in kwargs:
+            start = bisect.bisect_right(keys, kwargs['ExclusiveStartKey'][self.key_name])
+        items, scanned, size = [], 0, 0
+        with self.lock:
+            for position in range(start, len(keys)):
+                item = self.items.get(keys[position])
+                if item is None:
+                    continue
+                scanned += 1
+                size += _item_size(item)
+                if matches(item):
+                    items.append(self._project(item, kwargs))
+                if size >= self.PAGE_BYTES:
+                    last_key = {self.key_name: keys[position]}
+                    return {'Items': items, 'Count': len(items), 'ScannedCount': scanned, 'LastEvaluatedKey': last_key}
+        return {'Items': items, 'Count': len(items), 'ScannedCount': scanned}
+
+    def scan(self, **kwargs):
+        self.counters.count('scan')
+        _pause(self.latency)
+        with self.lock:
+            keys = sorted(self.items)
+        if 'TotalSegments' in kwargs:
+            total, segment = kwargs['TotalSegments'], kwargs['Segment']
+            keys = [key for key in keys if zlib.crc32(key.encode('utf-8')) % total == segment]
+        matches = lambda item: True
+        if 'FilterExpression' in kwargs:
+            matches = _condition(kwargs['FilterExpression'], kwargs.get('ExpressionAttributeNames', {}),
+                                 kwargs.get('ExpressionAttributeValues', {}))
+        return self._page(keys, kwargs, matches)
+
+    def query(self, IndexName=None, **kwargs):
+        self.counters.count('query')
+        _pause(self.latency)
+        if IndexName not in self.indexes:
+            raise Exception(f"ValidationException: The table does not have the specified index: {IndexName}")
+        index_key, projection = self.indexes[IndexName]
+        matches = _condition(kwargs['KeyConditionExpression'], kwargs.get('ExpressionAttributeNames', {}),
+                             kwargs.get('ExpressionAttributeValues', {}))
+        with self.lock:
+            keys = sorted(key for key, item in self.items.items() if index_key in item)
+        page = self._page(keys, kwargs, matches)
+        if projection != 'ALL':
+            kept = (self.key_name, index_key) + (() if projection == 'KEYS_ONLY' else tuple(projection))
+            page['Items'] = [{name: value for name, value in item.items() if name in kept} for item in page['Items']]
+        return page
+
+    def batch_get(self, request):
+        self.counters.count('batch_get_item')
+        _pause(self.latency)
+        names = request.get('ExpressionAttributeNames', {})
+        wanted = _names(request['ProjectionExpression'], names) if 'ProjectionExpression' in request else None
+        found = []
+        with self.lock:
+            for key in request['Keys']:
+                item = self.items.get(key[self.key_name])
+                if item is not None:
+                    found.append({name: item[name] for name in wanted if name in item} if wanted else dict(item))
+        return found
+
+class FakeDynamoDB:
+    """The service resource: batch_get_item across the fake tables."""
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    def Table(self, name):
+        return self.tables[name]
+
+    def batch_get_item(self, RequestItems):
+        return {
+            'Responses': {name: self.tables[name].batch_get(request) for name, request in RequestItems.items()},
+            'UnprocessedKeys': {}
+        }
+
+# ---------------------------------------------------------------------------------- S3
+
+class _Paginator:
+    def __init__(self, s3):
+        self.s3 = s3
+
+    def paginate(self, Bucket, Prefix=''):
+        with self.s3.lock:
+            keys = sorted(key for bucket, key in self.s3.objects if bucket == Bucket and key.startswith(Prefix))
+        for start in range(0, len(keys), 1000):
+            yield {'Contents': [{'Key': key} for key in keys[start:start + 1000]]}
+
+class FakeS3:
+    """In-memory S3 client holding every object's bytes."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.objects = {}  # (bucket, key) -> bytes
+        self.lock = threading.Lock()
+        self.counters = _Counters('put', 'get', 'delete', 'bytes_put')
+
+    @property
+    def stats(self):
+        return self.counters.stats
+
+    def _put(self, bucket, key, body):
+        self.counters.count('put')
+        self.counters.count('bytes_put', len(body))
+        _pause(self.latency)
+        with self.lock:
+            self.objects[(bucket, key)] = body
+
+    def put_object(self, Bucket, Key, Body, **kwargs):
+        self._put(Bucket, Key, Body.encode('utf-8') if isinstance(Body, str) else bytes(Body))
+        return {}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None, Config=None):
+        self._put(Bucket, Key, Fileobj.read())
+
+    def upload_file(self, Filename, Bucket, Key, ExtraArgs=None, Config=None):
+        with open(Filename, 'rb') as f:
+            self._put(Bucket, Key, f.read())
+
+    def get_object(self, Bucket, Key, **kwargs):
+        self.counters.count('get')
+        _pause(self.latency)
+        with self.lock:
+            body = self.objects.get((Bucket, Key))
+        if body is None:
+            raise Exception(f"NoSuchKey: {Key}")
+        return {'Body': io.BytesIO(body)}
+
+    def delete_objects(self, Bucket, Delete):
+        self.counters.count('delete', len(Delete['Objects']))
+        with self.lock:
+            for entry in Delete['Objects']:
+                self.objects.pop((Bucket, entry['Key']), None)
+        return {}
+
+    def get_paginator(self, name):
+        return _Paginator(self)
+
+    def keys(self, prefix=''):
+        with self.lock:
+            return [key for _, key in self.objects if key.startswith(prefix)]
+
+# ----------------------------------------------------------------------------- Bedrock
+
+SERVICES = ["Amazon S3", "AWS Lambda", "Amazon DynamoDB", "Amazon Bedrock", "Amazon EKS", "AWS Glue"]
+
+def fake_insights(prompt):
+    """A summary in the tool's output format, derived deterministically from the prompt."""
+    rng = random.Random(hashlib.sha1(prompt.encode('utf-8')).hexdigest())
+    words = re.findall(r'[a-z]{4,}', prompt[-4000:].lower()) or ['talk']
+    sentence = lambda n: " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+    return {
+        'customer_names': [f"Customer {rng.randint(1, 500)}"],
+        'presenter_details': [{'name': f"Presenter {rng.randint(1, 900)}", 'title': "Principal Engineer"}],
+        'industries': [rng.choice(["Financial Services", "Retail", "Media", "Healthcare"])],
+        'use_cases': [sentence(8)],
+        'problem_statements': [sentence(12)],
+        'solutions': [sentence(40)],
+        'aws_services': [{'time_stamp': f"{rng.randint(0, 59)}:{rng.randint(0, 59):02d}", 'time_duration': str(rng.randint(30, 300)),
+                          'service_name': service} for service in rng.sample(SERVICES, 3)],
+        'summary': " ".join(sentence(20) for _ in range(6)),
+        'key_points': [{'time_stamp': f"{minute}:00", 'time_duration': "60", 'point': sentence(15)} for minute in range(0, 50, 10)]
+    }
+
+class FakeBedrock:
+    """bedrock-runtime client answering Claude messages requests with canned summaries.
+
+    Each call takes latency seconds plus per_output_token seconds per generated token, and
+    a throttle_rate share of calls fail with a ThrottlingException, like an account at its
+    tokens-per-minute quota.
+    """
+
+    def __init__(self, latency=1.0, per_output_token=0.0, throttle_rate=0.0, seed=0):
+        self.latency = latency
+        self.per_output_token = per_output_token
+        self.throttle_rate = throttle_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.counters = _Counters('calls', 'throttled', 'input_tokens', 'output_tokens')
+
+    @property
+    def stats(self):
+        return self.counters.stats
+
+    def invoke_model(self, body, modelId, **kwargs):
+        self.counters.count('calls')
+        with self.random_lock:
+            throttled = self.random.random() < self.throttle_rate
+        if throttled:
+            self.counters.count('throttled')
+            _pause(0.05)
+            raise Exception("An error occurred (ThrottlingException) when calling the InvokeModel operation: "
+                            "Too many tokens per minute, please wait before trying again.")
+
+        request = json.loads(body)
+        prompt = "".join(part.get('text', '') if isinstance(part, dict) else str(part)
+                         for message in request.get('messages', [])
+                         for part in (message['content'] if isinstance(message['content'], list) else [message['content']]))
+        completion = "```json\n" + json.dumps(fake_insights(prompt), indent=2) + "\n```"
+        usage = {'input_tokens': max(1, len(prompt) // 4), 'output_tokens': max(1, len(completion) // 4)}
+        self.counters.count('input_tokens', usage['input_tokens'])
+        self.counters.count('output_tokens', usage['output_tokens'])
+        _pause(self.latency + usage['output_tokens'] * self.per_output_token)
+        response = {'content': [{'type': 'text', 'text': completion}], 'usage': usage}
+        return {'body': io.BytesIO(json.dumps(response).encode('utf-8'))}
+
+# ----------------------------------------------------------------------------- YouTube
+
+class RecordedYouTube:
+    """An HTTPConnectionPool stand-in serving pages recorded in a directory.
+
+    Layout: channel.html (first page of the channel's videos tab), browse/<token>.json
+    (continuation responses), watch/<video_id>.html and playlist/<playlist_id>.html.
+    Responses carry an ETag, and conditional requests for an unchanged page get a 304.
+    """
+
+    def __init__(self, directory, channel_path, latency=0.0):
+        self.directory = directory
+        self.channel_path = channel_path
+        self.latency = latency
+        self.counters = _Counters('get', 'post', 'not_modified', 'missing')
+
+    @property
+    def stats(self):
+        return self.counters.stats
+
+    def _serve(self, relative_path, headers):
+        _pause(self.latency)
+        path = os.path.join(self.directory, relative_path)
+        if not os.path.exists(path):
+            self.counters.count('missing')
+            return Response(404, {}, b"")
+        with open(path, 'rb') as f:
+            content = f.read()
+        etag = '"%s"' % hashlib.sha1(content).hexdigest()
+        if (headers or {}).get('If-None-Match') == etag:
+            self.counters.count('not_modified')
+            return Response(304, {'etag': etag}, b"")
+        return Response(200, {'etag': etag}, content)
+
+    def get(self, path, headers=None, timeout=None):
+        self.counters.count('get')
+        path = re.sub(r'^https?://[^/]+', '', path)
+        match = re.match(r'/watch\?v=([\w-]+)', path)
+        if match:
+            return self._serve(os.path.join('watch', f"{match.group(1)}.html"), headers)
+        match = re.match(r'/playlist\?list=([\w-]+)', path)
+        if match:
+            return self._serve(os.path.join('playlist', f"{match.group(1)}.html"), headers)
+        if path == self.channel_path:
+            return self._serve('channel.html', headers)
+        return self._serve(os.path.join('other', re.sub(r'\W+', '_', path)), headers)
+
+    def post(self, path, body, headers=None, timeout=None):
+        self.counters.count('post')
+        token = json.loads(body).get('continuation', '')
+        return self._serve(os.path.join('browse', f"{re.sub(r'[^A-Za-z0-9_-]', '_', token)}.json"), headers)
+
+class RecordedTranscripts:
+    """YouTubeTranscriptApi stand-in reading transcripts/<video_id>.json from a recording."""
+
+    def __init__(self, directory, latency=0.0):
+        self.directory = directory
+        self.latency = latency
+        self.counters = _Counters('fetched', 'missing')
+
+    @property
+    def stats(self):
+        return self.counters.stats
+
+    def get_transcript(self, video_id, *args, **kwargs):
+        _pause(self.latency)
+        path = os.path.join(self.directory, 'transcripts', f"{video_id}.json")
+        if not os.path.exists(path):
+            self.counters.count('missing')
+            raise Exception(f"Could not retrieve a transcript for the video {video_id}: Subtitles are disabled")
+        self.counters.count('fetched')
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+# ------------------------------------------------------------------ Synthetic recordings
+
+TRANSCRIPT_WORDS = ("so today we are going to talk about how our team moved the data platform to amazon s3 "
+                    "and aws lambda and why dynamodb helped us scale our customer facing services").split()
+
+def _page_html(variable, data):
+    return f"<html><head></head><body><script>var {variable} = {json.dumps(data)};</script></body></html>"
+
+def write_synthetic_recording(directory, videos=200, per_page=30, transcript_minutes=30, seed=0, playlist_id=None):
+    """Write a recording of a channel with `videos` re:Invent talks (and some other videos).
+
+    Every fifth video is not a re:Invent 2024 talk, so the title filter has work to do;
+    every twentieth talk has no transcript. With playlist_id the same videos are also
+    listed as that playlist. Returns the number of re:Invent talks.
+    """
+    rng = random.Random(seed)
+    for sub in ('browse', 'watch', 'transcripts'):
+        os.makedirs(os.path.join(directory, sub), exist_ok=True)
+
+    entries = []
+    talks = 0
+    while talks < videos:
+        n = len(entries)
+        video_id = f"vid{n:07d}"
+        is_talk = n % 5 != 4
+        title = f"AWS re:Invent 2024 - Session {n} on data platforms (ARC{n % 400:03d})" if is_talk else f"AWS Summit Sydney 2024 - Keynote {n}"
+        entries.append((video_id, title))
+        talks += is_talk
+
+        length = transcript_minutes * 60 + rng.randint(-300, 300)
+        player_response = {
+            'videoDetails': {'title': title, 'author': "AWS Events", 'lengthSeconds': str(length), 'viewCount': str(rng.randint(100, 90000))},
+            'microformat': {'playerMicroformatRenderer': {'publishDate': "2024-12-%02d" % rng.randint(2, 6), 'ownerChannelName': "AWS Events"}}
+        }
+        with open(os.path.join(directory, 'watch', f"{video_id}.html"), 'w', encoding='utf-8') as f:
+            f.write(_page_html('ytInitialPlayerResponse', player_response) + "<!-- %s -->" % ("x" * 200000))
+
+        if is_talk and n % 20 != 3:
+            start, transcript = 0.0, []
+            while start < length:
+                duration = rng.uniform(2.0, 4.0)
+                text = " ".join(rng.choice(TRANSCRIPT_WORDS) for _ in range(rng.randint(5, 12)))
+                transcript.append({'text': text + ("." if rng.random() < 0.3 else ""), 'start': round(start, 3), 'duration': round(duration, 3)})
+                start += duration
+            with open(os.path.join(directory, 'transcripts', f"{video_id}.json"), 'w', encoding='utf-8') as f:
+                json.dump(transcript, f)
+
+    def renderers(chunk):
+        return [{'richItemRenderer': {'content': {'videoRenderer': {'videoId': video_id, 'title': {'runs': [{'text': title}]}}}}}
+                for video_id, title in chunk]
+
+    def continuation(page):
+        return {'continuationItemRenderer': {'continuationEndpoint': {'continuationCommand': {'token': f"page-{page}"}}}}
+
+    pages = [entries[start:start + per_page] for start in range(0, len(entries), per_page)]
+    for number, chunk in enumerate(pages):
+        items = renderers(chunk) + ([continuation(number + 1)] if number + 1 < len(pages) else [])
+        if number == 0:
+            data = {'contents': {'twoColumnBrowseResultsRenderer': {'tabs': [
+                {'tabRenderer': {'selected': True, 'content': {'richGridRenderer': {'contents': items}}}}
+            ]}}}
+            with open(os.path.join(directory, 'channel.html'), 'w', encoding='utf-8') as f:
+                f.write(_page_html('ytInitialData', data))
+            if playlist_id:
+                data = {'contents': {'twoColumnBrowseResultsRenderer': {'tabs': [{'tabRenderer': {'content': {'sectionListRenderer': {
+                    'contents': [{'itemSectionRenderer': {'contents': [{'playlistVideoListRenderer': {'contents': items}}]}}]
+                }}}}]}}}
+                os.makedirs(os.path.join(directory, 'playlist'), exist_ok=True)
+                with open(os.path.join(directory, 'playlist', f"{playlist_id}.html"), 'w', encoding='utf-8') as f:
+                    f.write(_page_html('ytInitialData', data))
+        else:
+            data = {'onResponseReceivedActions': [{'appendContinuationItemsAction': {'continuationItems': items}}]}
+            with open(os.path.join(directory, 'browse', f"page-{number}.json"), 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+    return talks
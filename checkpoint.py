@@ -0,0 +1,113 @@
+import decimal
+import json
+import os
+import threading
+import time
+
+from atomic_file import atomic_write
+
+CURSOR_COMPLETE = 'complete'  # Cursor value of a scan segment or query that has been read to the end
+
+def _json_default(value):
+    # DynamoDB numbers come back as Decimal and sets as Python sets
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class Checkpoint:
+    """Durable progress of one long-running action, so an interrupted run can resume.
+
+    A checkpoint holds named cursors (LastEvaluatedKey of each scan segment, a continuation
+    token, ...), free-form values, the keys of completed items and the items still in
+    flight with the data needed to redo them. It is written atomically to a JSON file at
+    most every `interval` seconds as progress is reported, and always by save(). A run
+    that finds a checkpoint file resumes from it; complete() removes the file.
+    """
+
+    def __init__(self, path, interval=5.0):
+        self.path = path
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.started = set()  # Keys handed out by start() during this run
+        self.last_saved = time.monotonic()
+
+        state = {}
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable checkpoint {path}: {e}")
+        self.resumed = bool(state)
+        self.cursors = state.get('cursors', {})
+        self.values = state.get('values', {})
+        self.done = set(state.get('done', []))
+        self.in_flight = state.get('in_flight', {})
+        if self.resumed:
+            print(f"Resuming from checkpoint {path}: {len(self.done)} items done, "
+                  f"{len(self.in_flight)} in flight, saved {state.get('saved_at', 'earlier')}")
+
+    def cursor(self, name, default=None):
+        with self.lock:
+            return self.cursors.get(name, default)
+
+    def set_cursor(self, name, value):
+        with self.lock:
+            self.cursors[name] = value
+
+    def value(self, name, default=None):
+        with self.lock:
+            return self.values.get(name, default)
+
+    def set_value(self, name, value):
+        with self.lock:
+            self.values[name] = value
+
+    def pending_items(self):
+        """Items that were in flight when the previous run stopped, to be redone first."""
+        with self.lock:
+            return list(self.in_flight.values())
+
+    def start(self, key, item):
+        """Record item as in flight; False if it is already done or was started in this run."""
+        with self.lock:
+            if key in self.done or key in self.started:
+                return False
+            self.started.add(key)
+            self.in_flight[key] = item
+        self.maybe_save()
+        return True
+
+    def finish(self, key):
+        """Record that the item's work is complete (for writes: durably stored)."""
+        with self.lock:
+            self.in_flight.pop(key, None)
+            self.done.add(key)
+        self.maybe_save()
+
+    def maybe_save(self):
+        """Save if the last save is older than the interval; call at consistent points."""
+        if time.monotonic() - self.last_saved >= self.interval:
+            self.save()
+
+    def save(self):
+        with self.lock:
+            self.last_saved = time.monotonic()
+            body = json.dumps({
+                'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'cursors': self.cursors,
+                'values': self.values,
+                'done': sorted(self.done),
+                'in_flight': self.in_flight
+            }, default=_json_default)
+            atomic_write(self.path, body, durable=True)
+
+    def complete(self):
+        """The action finished; the next run starts from scratch."""
+        with self.lock:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,91 @@
+import os
+import threading
+import time
+
+class DiskCache:
+    """Entries stored as files under directory/<key[:2]>/, evicted least-recently-used by total size.
+
+    An entry is one file per suffix in SUFFIXES, named after its key. The first suffix is
+    the entry's main file: its size counts against max_bytes and its modification time
+    doubles as the LRU clock, so the index is rebuilt from the directory on start.
+    """
+
+    SUFFIXES = ()
+
+    def __init__(self, directory, max_bytes, counters=()):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.stats = dict.fromkeys(tuple(counters) + ('evictions',), 0)
+        self.entries = {}  # key -> (size, last_used)
+        self.total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _paths(self, key):
+        base = os.path.join(self.directory, key[:2], key)
+        return [base + suffix for suffix in self.SUFFIXES]
+
+    def _load_index(self):
+        suffix = self.SUFFIXES[0]
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(suffix):
+                    stat = os.stat(os.path.join(root, name))
+                    self.entries[name[:-len(suffix)]] = (stat.st_size, stat.st_mtime)
+                    self.total_bytes += stat.st_size
+
+    def _count(self, name, amount=1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def _stored(self, key, size):
+        # Account for an entry just written, whose main file is size bytes
+        with self.lock:
+            previous = self.entries.get(key)
+            if previous:
+                self.total_bytes -= previous[0]
+            self.entries[key] = (size, time.time())
+            self.total_bytes += size
+            self._evict()
+
+    def _touch(self, key):
+        now = time.time()
+        try:
+            os.utime(self._paths(key)[0], (now, now))
+        except OSError:
+            return  # Evicted meanwhile
+        with self.lock:
+            if key in self.entries:
+                self.entries[key] = (self.entries[key][0], now)
+
+    def _remove_files(self, key):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _discard(self, key):
+        self._remove_files(key)
+        with self.lock:
+            previous = self.entries.pop(key, None)
+            if previous:
+                self.total_bytes -= previous[0]
+
+    def _evict(self):
+        # Called with the lock held
+        if self.total_bytes <= self.max_bytes:
+            return
+        for key, (size, _) in sorted(self.entries.items(), key=lambda entry: entry[1][1]):
+            if self.total_bytes <= self.max_bytes:
+                break
+            self._remove_files(key)
+            del self.entries[key]
+            self.total_bytes -= size
+            self.stats['evictions'] += 1
+
+    def report(self):
+        """Return the counters plus the current entry count and size."""
+        with self.lock:
+            return dict(self.stats, entries=len(self.entries), bytes=self.total_bytes)
@@ -0,0 +1,129 @@
+import threading
+import time
+
+from checkpoint import CURSOR_COMPLETE
+
+def scan_segment(table, segment, total_segments, process_item, progress, checkpoint=None, **scan_kwargs):
+    """Scan one segment of the table page by page, calling process_item for each item.
+
+    With a checkpoint, the segment starts from its saved LastEvaluatedKey and records the
+    key after every page, so an interrupted scan resumes instead of starting over.
+    """
+    cursor_name = f"scan {segment}/{total_segments}"
+    last_evaluated_key = checkpoint.cursor(cursor_name) if checkpoint else None
+    if last_evaluated_key == CURSOR_COMPLETE:
+        return 0
+    scanned = 0
+    processed = 0
+
+    while True:
+        page_kwargs = dict(scan_kwargs, Segment=segment, TotalSegments=total_segments)
+        if last_evaluated_key:
+            page_kwargs['ExclusiveStartKey'] = last_evaluated_key
+
+        response = table.scan(**page_kwargs)
+        items = response.get('Items', [])
+        scanned += response.get('ScannedCount', len(items))
+
+        for item in items:
+            try:
+                process_item(item)
+            except Exception as e:
+                print(f"[segment {segment}] Error processing item {item.get('video_url')}: {e}")
+            processed += 1
+
+        progress(segment, scanned, processed)
+
+        # If there's a LastEvaluatedKey, more records exist in this segment
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if checkpoint:
+            checkpoint.set_cursor(cursor_name, last_evaluated_key or CURSOR_COMPLETE)
+            checkpoint.maybe_save()
+        if not last_evaluated_key:
+            return processed
+
+def parallel_scan(table, process_item, total_segments=4, label="scan", failures=None, checkpoint=None, **scan_kwargs):
+    """Scan a DynamoDB table with one thread per Segment/TotalSegments slice.
+
+    Every segment calls process_item on its own thread for each item it reads, and reports
+    its own progress. Extra keyword arguments (FilterExpression, ProjectionExpression, ...)
+    are passed through to table.scan. Returns the number of items processed per segment.
+    Segments that fail are reported and, when a failures list is given, appended to it as
+    (segment, error) so callers can tell a partial scan from a complete one. A checkpoint
+    makes every segment resume from its last recorded page.
+    """
+    results = [0] * total_segments
+    print_lock = threading.Lock()
+    start_time = time.time()
+
+    def progress(segment, scanned, processed):
+        with print_lock:
+            print(f"[{label} segment {segment + 1}/{total_segments}] scanned {scanned} items, "
+                  f"processed {processed}")
+
+    def run(segment):
+        try:
+            results[segment] = scan_segment(table, segment, total_segments, process_item, progress, checkpoint, **scan_kwargs)
+        except Exception as e:
+            print(f"[{label} segment {segment + 1}/{total_segments}] failed: {e}")
+            if failures is not None:
+                failures.append((segment, str(e)))
+
+    threads = [
+        threading.Thread(target=run, args=(segment,), name=f"{label}-segment-{segment}", daemon=True)
+        for segment in range(total_segments)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.time() - start_time
+    print(f"[{label}] processed {sum(results)} items across {total_segments} segments in {elapsed:.1f}s")
+    return results
+
+def projection(*names):
+    """Build ProjectionExpression/ExpressionAttributeNames for attribute names (reserved words are safe)."""
+    placeholders = {f"#p{n}": name for n, name in enumerate(names)}
+    return {
+        'ProjectionExpression': ", ".join(placeholders),
+        'ExpressionAttributeNames': placeholders
+    }
+
+def query_all(table, process_item, label="query", checkpoint=None, **query_kwargs):
+    """Query a table or index page by page, calling process_item for each item.
+
+    Extra keyword arguments (IndexName, KeyConditionExpression, ...) are passed through to
+    table.query. With a checkpoint the query resumes from its last recorded page. Returns
+    the number of items processed.
+    """
+    cursor_name = f"query {query_kwargs.get('IndexName', 'table')}"
+    last_evaluated_key = checkpoint.cursor(cursor_name) if checkpoint else None
+    if last_evaluated_key == CURSOR_COMPLETE:
+        return 0
+    processed = 0
+    start_time = time.time()
+
+    while True:
+        page_kwargs = dict(query_kwargs)
+        if last_evaluated_key:
+            page_kwargs['ExclusiveStartKey'] = last_evaluated_key
+
+        response = table.query(**page_kwargs)
+        for item in response.get('Items', []):
+            try:
+                process_item(item)
+            except Exception as e:
+                print(f"[{label}] Error processing item {item.get('video_url')}: {e}")
+            processed += 1
+
+        print(f"[{label}] processed {processed} items")
+        last_evaluated_key = response.get('LastEvaluatedKey')
+        if checkpoint:
+            checkpoint.set_cursor(cursor_name, last_evaluated_key or CURSOR_COMPLETE)
+            checkpoint.maybe_save()
+        if not last_evaluated_key:
+            break
+
+    print(f"[{label}] processed {processed} items in {time.time() - start_time:.1f}s")
+    return processed
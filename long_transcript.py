@@ -0,0 +1,108 @@
+from bedrock_governor import estimate_tokens
+
+NOT_AVAILABLE = "Not Available"
+
+# List fields of the summary JSON that hold plain strings
+STRING_LIST_FIELDS = ['customer_names', 'industries', 'use_cases', 'problem_statements', 'solutions']
+
+def split_transcript(transcript, max_tokens):
+    """Split a "mm:ss - text" transcript into chunks of at most max_tokens, on line boundaries.
+
+    Every chunk keeps the original timestamps and starts with the header row, so time
+    stamps reported by the model for a chunk are still absolute positions in the video.
+    """
+    lines = transcript.split("\n")
+    header = ""
+    if lines and lines[0].startswith("start - text"):
+        header = lines[0]
+        lines = lines[1:]
+
+    chunks = []
+    current = []
+    current_tokens = 0
+    for line in lines:
+        line_tokens = estimate_tokens(line) + 1
+        if current and current_tokens + line_tokens > max_tokens:
+            chunks.append("\n".join([header] + current if header else current))
+            current = []
+            current_tokens = 0
+        current.append(line)
+        current_tokens += line_tokens
+
+    if current:
+        chunks.append("\n".join([header] + current if header else current))
+    return chunks
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+def _is_not_available(value):
+    return isinstance(value, str) and value.strip().lower().startswith(NOT_AVAILABLE.lower())
+
+def _merge_unique(values, key):
+    merged = []
+    seen = set()
+    for value in values:
+        if _is_not_available(value):
+            continue
+        identity = key(value)
+        if identity in seen:
+            continue
+        seen.add(identity)
+        merged.append(value)
+    return merged or [NOT_AVAILABLE]
+
+def _text_key(value):
+    return value.strip().lower() if isinstance(value, str) else repr(value)
+
+def _field_key(field):
+    def key(value):
+        if isinstance(value, dict):
+            return _text_key(value.get(field, ''))
+        return _text_key(value)
+    return key
+
+def merge_insights(partials):
+    """Merge the JSON results of several transcript chunks into the generate_summary schema.
+
+    String lists are de-duplicated case-insensitively, presenters by name and AWS services
+    by service name (keeping the first mention, which comes from the earliest chunk).
+    Key points are concatenated in chunk order. Partial summaries are returned as a list
+    in 'summary' so the caller can reduce them.
+    """
+    partials = [partial for partial in partials if partial]
+    merged = {}
+
+    for field in STRING_LIST_FIELDS:
+        values = [value for partial in partials for value in _as_list(partial.get(field))]
+        merged[field] = _merge_unique(values, _text_key)
+
+    presenters = [value for partial in partials for value in _as_list(partial.get('presenter_details'))]
+    merged['presenter_details'] = [
+        presenter for presenter in _merge_unique(presenters, _field_key('name'))
+        if not _is_not_available(presenter.get('name') if isinstance(presenter, dict) else presenter)
+    ] or [{'name': NOT_AVAILABLE, 'title': NOT_AVAILABLE}]
+
+    services = [value for partial in partials for value in _as_list(partial.get('aws_services'))]
+    merged['aws_services'] = _merge_unique(services, _field_key('service_name'))
+
+    merged['key_points'] = [
+        point for partial in partials for point in _as_list(partial.get('key_points'))
+        if not _is_not_available(point)
+    ] or [NOT_AVAILABLE]
+
+    merged['summary'] = [
+        partial['summary'] for partial in partials
+        if partial.get('summary') and not _is_not_available(partial['summary'])
+    ]
+
+    # Keep any extra fields the model returned, taking the first chunk's value
+    for partial in partials:
+        for key, value in partial.items():
+            merged.setdefault(key, value)
+
+    return merged
@@ -0,0 +1,218 @@
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+from atomic_file import atomic_write
+
+SAMPLE_SIZE = 10000  # Latencies kept per timer (reservoir sample) for the percentiles
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+PROMETHEUS_PREFIX = 'youtube_ai_'
+
+# Error codes and messages that mean a request was throttled
+THROTTLE_ERRORS = ('Throttling', 'ProvisionedThroughputExceeded', 'RequestLimitExceeded', 'SlowDown', 'TooManyRequests', 'Too many')
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(len(sorted_values) * fraction), len(sorted_values) - 1)]
+
+def _label_text(labels):
+    return ",".join(f'{name}="{value}"' for name, value in labels)
+
+class Metrics:
+    """Process-wide latency timers and counters, reported at the end of an action.
+
+    Timers keep a count, sum, maximum and a reservoir sample of their latencies for the
+    percentiles, so memory stays bounded however long the run is. Counters add up
+    retries, throttles, tokens, consumed capacity and so on. Both are keyed by a name and
+    optional labels (host, operation, stage, ...).
+    """
+
+    def __init__(self, sample_size=SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.timers = {}  # (name, labels) -> {'count', 'sum', 'max', 'samples'}
+            self.counters = {}  # (name, labels) -> value
+            self.start_time = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def observe(self, name, seconds, **labels):
+        """Record one latency of timer `name`."""
+        key = self._key(name, labels)
+        with self.lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                timer = self.timers[key] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'samples': []}
+            timer['count'] += 1
+            timer['sum'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+            if len(timer['samples']) < self.sample_size:
+                timer['samples'].append(seconds)
+            else:
+                # Reservoir sampling keeps a uniform sample of every latency seen
+                slot = random.randrange(timer['count'])
+                if slot < self.sample_size:
+                    timer['samples'][slot] = seconds
+
+    def increment(self, name, amount=1, **labels):
+        """Add amount to counter `name`."""
+        if not amount:
+            return
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time the enclosed block; an exception also counts in `<name>_errors`."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.increment(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def instrument_boto3(self, client, service):
+        """Time every call of a boto3 client and count its retries, throttles and usage.
+
+        DynamoDB calls are asked to return their consumed capacity, and Bedrock token
+        counts are read from the response headers, so no call site needs to change.
+        """
+        events = client.meta.events
+
+        def provide_params(params, model, **kwargs):
+            if service == 'dynamodb' and 'ReturnConsumedCapacity' in model.input_shape.members:
+                params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+        def before_parameter_build(params, model, context, **kwargs):
+            context['metrics_start'] = time.perf_counter()
+            context['metrics_operation'] = model.name
+            if 'modelId' in params:
+                context['metrics_model'] = params['modelId']
+
+        def failed(operation, error):
+            self.increment('aws_request_errors', service=service, operation=operation)
+            if any(marker in error for marker in THROTTLE_ERRORS):
+                self.increment('throttles', service=service, operation=operation)
+
+        def after_call(http_response, parsed, model, context, **kwargs):
+            self.observe('aws_request', time.perf_counter() - context.get('metrics_start', time.perf_counter()),
+                         service=service, operation=model.name)
+            metadata = parsed.get('ResponseMetadata', {})
+            self.increment('aws_retries', metadata.get('RetryAttempts', 0), service=service, operation=model.name)
+            if http_response.status_code >= 300:
+                failed(model.name, parsed.get('Error', {}).get('Code', ''))
+                return
+
+            consumed = parsed.get('ConsumedCapacity')
+            for entry in consumed if isinstance(consumed, list) else [consumed] if consumed else []:
+                self.increment('dynamodb_consumed_capacity', entry.get('CapacityUnits', 0),
+                               table=entry.get('TableName', ''), operation=model.name)
+
+            headers = metadata.get('HTTPHeaders', {})
+            for direction in ('input', 'output'):
+                tokens = headers.get(f'x-amzn-bedrock-{direction}-token-count')
+                if tokens:
+                    self.increment(f'bedrock_{direction}_tokens', int(tokens), model=context.get('metrics_model', ''))
+
+        def after_call_error(exception, context, **kwargs):
+            # Raised before a response was parsed: connection errors, timeouts, ...
+            operation = context.get('metrics_operation', '')
+            self.observe('aws_request', time.perf_counter() - context.get('metrics_start', time.perf_counter()),
+                         service=service, operation=operation)
+            failed(operation, str(exception))
+
+        events.register('provide-client-params', provide_params)
+        events.register('before-parameter-build', before_parameter_build)
+        events.register('after-call', after_call)
+        events.register('after-call-error', after_call_error)
+
+    def summary(self):
+        """Per-timer count, total seconds and latency percentiles, plus the counters."""
+        with self.lock:
+            timers = {key: dict(timer, samples=sorted(timer['samples'])) for key, timer in self.timers.items()}
+            counters = dict(self.counters)
+
+        report = {'timers': {}, 'counters': {}}
+        for (name, labels), timer in sorted(timers.items()):
+            entry = {'count': timer['count'], 'sum': timer['sum'], 'max': timer['max']}
+            for quantile in QUANTILES:
+                entry[f"p{int(quantile * 100)}"] = percentile(timer['samples'], quantile)
+            report['timers'][(name, labels)] = entry
+        for key, value in sorted(counters.items()):
+            report['counters'][key] = value
+        return report
+
+    def format_summary(self, action):
+        """The run report as text: one line per timer and per counter."""
+        report = self.summary()
+        lines = [f"Run report for {action}: {time.time() - self.start_time:.1f}s",
+                 f"{'timer':<60} {'count':>8} {'total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+        for (name, labels), entry in report['timers'].items():
+            label = f"{name}{{{_label_text(labels)}}}" if labels else name
+            lines.append(f"{label:<60} {entry['count']:>8} {entry['sum']:>9.1f} {entry['p50'] * 1000:>9.1f} "
+                         f"{entry['p95'] * 1000:>9.1f} {entry['p99'] * 1000:>9.1f} {entry['max'] * 1000:>9.1f}")
+        for (name, labels), value in report['counters'].items():
+            label = f"{name}{{{_label_text(labels)}}}" if labels else name
+            lines.append(f"{label:<60} {value:>8g}")
+        return "\n".join(lines)
+
+    def prometheus_text(self, action):
+        """The metrics in the Prometheus text exposition format (timers as summaries)."""
+        report = self.summary()
+        lines = []
+        typed = set()
+        for (name, labels), entry in report['timers'].items():
+            metric = PROMETHEUS_PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', name) + '_seconds'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            labels = (('action', action),) + labels
+            for quantile in QUANTILES:
+                lines.append(f"{metric}{{{_label_text(labels + (('quantile', str(quantile)),))}}} {entry[f'p{int(quantile * 100)}']:.6f}")
+            lines.append(f"{metric}_sum{{{_label_text(labels)}}} {entry['sum']:.6f}")
+            lines.append(f"{metric}_count{{{_label_text(labels)}}} {entry['count']}")
+        for (name, labels), value in report['counters'].items():
+            metric = PROMETHEUS_PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', name) + '_total'
+            if metric not in typed:
+                typed.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{{{_label_text((('action', action),) + labels)}}} {value:g}")
+        metric = PROMETHEUS_PREFIX + 'run_duration_seconds'
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f'{metric}{{action="{action}"}} {time.time() - self.start_time:.3f}')
+        lines.append(f"# TYPE {PROMETHEUS_PREFIX}run_finished_timestamp_seconds gauge")
+        lines.append(f'{PROMETHEUS_PREFIX}run_finished_timestamp_seconds{{action="{action}"}} {time.time():.0f}')
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, directory, action):
+        """Print the run report and write it, with a Prometheus text file, to directory.
+
+        The report is kept per run (<action>-<time>.txt); <action>.prom is replaced
+        atomically so a node_exporter textfile collector never reads half a file.
+        """
+        text = self.format_summary(action)
+        print(text)
+        action = re.sub(r'[^A-Za-z0-9_-]+', '_', action)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{action}-{time.strftime('%Y%m%d-%H%M%S')}.txt"), 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+        atomic_write(os.path.join(directory, f"{action}.prom"), self.prometheus_text(action))
+        return text
+
+# Shared by every module, so library code can record without being handed a registry
+metrics = Metrics()
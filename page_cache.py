@@ -0,0 +1,98 @@
+import gzip
+import hashlib
+import json
+import time
+
+from atomic_file import atomic_write
+from disk_cache import DiskCache
+
+class PageCache(DiskCache):
+    """On-disk cache of fetched pages with HTTP validators, stored gzip-compressed.
+
+    Each entry is a gzip body plus a small JSON file holding the URL, ETag, Last-Modified
+    and fetch time. Entries are evicted least-recently-used once the cache grows past
+    max_bytes.
+    """
+
+    SUFFIXES = ('.gz', '.json')
+
+    def __init__(self, directory, max_bytes):
+        super().__init__(directory, max_bytes, counters=('fresh_hits', 'revalidated', 'fetched', 'errors', 'bytes_fetched'))
+
+    def _key(self, url):
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _read(self, key):
+        body_path, meta_path = self._paths(key)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = gzip.decompress(f.read())
+        except (OSError, ValueError, EOFError):
+            return None, None
+        return meta, body
+
+    def _write(self, key, meta, body):
+        body_path, meta_path = self._paths(key)
+        compressed = gzip.compress(body)
+        atomic_write(body_path, compressed)
+        atomic_write(meta_path, json.dumps(meta))
+        self._stored(key, len(compressed))
+
+    def _touch(self, key, meta=None):
+        if meta is not None:
+            try:
+                atomic_write(self._paths(key)[1], json.dumps(meta))
+            except OSError:
+                return  # Evicted meanwhile
+        super()._touch(key)
+
+    def discard(self, url):
+        """Drop the cached copy of url, e.g. once it turned out not to be the expected page."""
+        self._discard(self._key(url))
+
+    def fetch(self, client, url, max_age):
+        """Return the body of url, using the cache when it is younger than max_age seconds.
+
+        Stale entries are revalidated with If-None-Match / If-Modified-Since, so an
+        unchanged page costs a 304 instead of a full download. Any other status than 200
+        or 304 raises and leaves the cache untouched.
+        """
+        key = self._key(url)
+        meta, body = self._read(key)
+        now = time.time()
+
+        if meta is not None and now - meta['fetched_at'] < max_age:
+            self._touch(key)
+            self._count('fresh_hits')
+            return body
+
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+
+        response = client.get(url, headers=headers)
+        if response.status == 304 and meta is not None:
+            meta['fetched_at'] = now
+            self._touch(key, meta)
+            self._count('revalidated')
+            return body
+
+        # Throttling (429), server errors and redirects to consent pages are not the page
+        if response.status != 200:
+            self._count('errors')
+            raise Exception(f"HTTP {response.status} fetching {url}")
+
+        self._count('fetched')
+        self._count('bytes_fetched', len(response.content))
+        self._write(key, {
+            'url': url,
+            'etag': response.headers.get('etag'),
+            'last_modified': response.headers.get('last-modified'),
+            'fetched_at': now
+        }, response.content)
+        return response.content
@@ -0,0 +1,101 @@
+import collections
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import metrics
+
+# Marker placed on a queue to tell a worker that no more items will arrive
+_END = object()
+
+def run_pipeline(source, stages, queue_size=50):
+    """Run items from `source` through a chain of stages connected by bounded queues.
+
+    `stages` is a list of (name, func, workers) tuples. Each stage gets its own pool of
+    worker threads; a worker calls func(item) and passes the result on to the next stage.
+    Returning None drops the item. Because every queue is bounded, a slow stage blocks the
+    stages in front of it instead of letting work pile up in memory.
+
+    Returns a dict of per-stage counters: processed, dropped and failed.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+    stats = {name: {'processed': 0, 'dropped': 0, 'failed': 0} for name, _, _ in stages}
+    lock = threading.Lock()
+    remaining = [workers for _, _, workers in stages]
+    threads = []
+
+    def worker(index):
+        name, func, _ = stages[index]
+        in_queue = queues[index]
+        out_queue = queues[index + 1] if index + 1 < len(stages) else None
+
+        while True:
+            item = in_queue.get()
+            if item is _END:
+                break
+            start = time.perf_counter()
+            try:
+                result = func(item)
+            except Exception as e:
+                print(f"Error in {name} stage: {e}")
+                with lock:
+                    stats[name]['failed'] += 1
+                continue
+            finally:
+                metrics.observe('pipeline_stage', time.perf_counter() - start, stage=name)
+
+            with lock:
+                stats[name]['processed' if result is not None else 'dropped'] += 1
+            if result is not None and out_queue is not None:
+                out_queue.put(result)
+
+        # The last worker of a stage to finish shuts down the next stage
+        with lock:
+            remaining[index] -= 1
+            last_worker = remaining[index] == 0
+        if last_worker and out_queue is not None:
+            for _ in range(stages[index + 1][2]):
+                out_queue.put(_END)
+
+    for index, (name, _, workers) in enumerate(stages):
+        for n in range(workers):
+            thread = threading.Thread(target=worker, args=(index,), name=f"{name}-{n}", daemon=True)
+            thread.start()
+            threads.append(thread)
+
+    # Feed the first stage from the calling thread so the source is consumed lazily
+    start_time = time.time()
+    try:
+        for item in source:
+            queues[0].put(item)
+    finally:
+        for _ in range(stages[0][2]):
+            queues[0].put(_END)
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.time() - start_time
+    for name, counters in stats.items():
+        print(f"{name}: {counters['processed']} passed, {counters['dropped']} dropped, "
+              f"{counters['failed']} failed")
+    print(f"Pipeline finished in {elapsed:.1f}s")
+    return stats
+
+def map_bounded(func, items, workers, window=None):
+    """Yield func(item) for every item, in order, computed on a pool of worker threads.
+
+    Unlike executor.map, which submits every item up front and holds all results until
+    they are consumed, at most `window` items (default twice the workers) are submitted
+    and not yet consumed at any time, so memory stays bounded when the results are large.
+    """
+    window = window or workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for item in items:
+            pending.append(executor.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
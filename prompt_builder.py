@@ -0,0 +1,22 @@
+import textwrap
+
+from bedrock_governor import estimate_tokens
+
+class PromptBuilder:
+    """Assemble prompts from a fixed instruction prefix and exactly one piece of content.
+
+    The prefix is dedented and measured once, so building a prompt only costs the size of
+    the content that is attached to it.
+    """
+
+    def __init__(self, instructions, separator=" - Transcript: "):
+        self.prefix = textwrap.dedent(instructions).strip() + separator
+        self.prefix_tokens = estimate_tokens(self.prefix)
+
+    def build(self, content):
+        """Return (prompt, estimated_input_tokens) for one piece of content."""
+        return self.prefix + content, self.prefix_tokens + estimate_tokens(content)
+
+    def content_budget(self, context_tokens, max_output_tokens):
+        """Largest content size (in tokens) that still fits in the context window."""
+        return max(0, context_tokens - max_output_tokens - self.prefix_tokens)
@@ -0,0 +1,120 @@
+import gzip
+import hashlib
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from boto3.s3.transfer import TransferConfig
+
+class IncrementalS3Exporter:
+    """Upload text objects under a prefix, skipping the ones whose content hasn't changed.
+
+    A manifest of file name -> version is kept in S3 next to the prefix. The version is
+    the sha256 of the content, or a caller-supplied fingerprint of the source data, which
+    lets callers check is_current() before they build the content at all.
+    Changed objects are uploaded concurrently through boto3's managed transfer, optionally
+    gzip-compressed (stored with Content-Encoding: gzip). The manifest is also written
+    every manifest_interval seconds while uploads complete, so an interrupted export
+    doesn't upload the same files again. close() waits for the uploads and writes the
+    final manifest.
+    """
+
+    def __init__(self, s3_client, bucket, prefix, manifest_key, workers=8, gzip_objects=False, manifest_interval=60.0):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.manifest_key = manifest_key
+        self.gzip_objects = gzip_objects
+        self.transfer_config = TransferConfig(use_threads=False)
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.in_flight = threading.BoundedSemaphore(workers * 4)
+        self.lock = threading.Lock()
+        self.manifest_lock = threading.Lock()  # One manifest write at a time
+        self.manifest_interval = manifest_interval
+        self.manifest_saved = time.monotonic()
+        self.stats = {'unchanged': 0, 'uploaded': 0, 'failed': 0, 'bytes_uploaded': 0}
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=self.manifest_key)
+            return json.loads(gzip.decompress(response['Body'].read()).decode('utf-8'))
+        except Exception as e:
+            print(f"No export manifest found ({e}), uploading every object.")
+            return {}
+
+    def is_current(self, file_name, version):
+        """True (and counted as unchanged) if the manifest already has this version of file_name."""
+        with self.lock:
+            if self.manifest.get(file_name) == version:
+                self.stats['unchanged'] += 1
+                return True
+        return False
+
+    def export(self, file_name, content, content_type='text/plain', version=None):
+        """Queue file_name for upload unless the manifest already has the same content (or version)."""
+        body = content.encode('utf-8')
+        digest = version or hashlib.sha256(body).hexdigest()
+        with self.lock:
+            if self.manifest.get(file_name) == digest:
+                self.stats['unchanged'] += 1
+                return False
+
+        self.in_flight.acquire()
+        self.executor.submit(self._upload, file_name, body, digest, content_type)
+        return True
+
+    def _upload(self, file_name, body, digest, content_type):
+        extra_args = {'ContentType': content_type}
+        if self.gzip_objects:
+            body = gzip.compress(body)
+            extra_args['ContentEncoding'] = 'gzip'
+
+        try:
+            self.s3_client.upload_fileobj(
+                io.BytesIO(body),
+                self.bucket,
+                f"{self.prefix}{file_name}",
+                ExtraArgs=extra_args,
+                Config=self.transfer_config
+            )
+            with self.lock:
+                self.manifest[file_name] = digest
+                self.stats['uploaded'] += 1
+                self.stats['bytes_uploaded'] += len(body)
+            print(f"Successfully uploaded {file_name} to S3.")
+        except Exception as e:
+            with self.lock:
+                self.stats['failed'] += 1
+            print(f"Error uploading {file_name} to S3: {e}")
+        finally:
+            self.in_flight.release()
+
+        if time.monotonic() - self.manifest_saved >= self.manifest_interval:
+            try:
+                self._save_manifest()
+            except Exception as e:
+                print(f"Error saving the export manifest: {e}")
+
+    def _save_manifest(self):
+        with self.manifest_lock:
+            self.manifest_saved = time.monotonic()
+            with self.lock:
+                manifest = gzip.compress(json.dumps(self.manifest, sort_keys=True).encode('utf-8'))
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=self.manifest_key,
+                Body=manifest,
+                ContentType='application/json',
+                ContentEncoding='gzip'
+            )
+
+    def close(self):
+        """Wait for all uploads, save the manifest and return the counters."""
+        self.executor.shutdown(wait=True)
+        self._save_manifest()
+        print(f"S3 export: {self.stats['uploaded']} uploaded, {self.stats['unchanged']} unchanged, "
+              f"{self.stats['failed']} failed")
+        return dict(self.stats)
@@ -0,0 +1,415 @@
+import hashlib
+import json
+import math
+import os
+import pickle
+import re
+import threading
+from array import array
+from collections import Counter
+
+from atomic_file import atomic_open
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# Start of a stored transcript entry; its caption text may span several lines
+TRANSCRIPT_ENTRY_PATTERN = re.compile(r'^(\d+):(\d{2}) - "', re.MULTILINE)
+TIMESTAMP_PATTERN = re.compile(r'(\d+):(\d{1,2})(?::(\d{1,2}))?')
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
+
+# Words too common to rank on; they are still matched inside phrase queries
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have i in is it its of on or so that the this to
+we with you your our they them was were will can do just like um uh yeah okay
+""".split())
+
+FIELDS = ('transcript', 'summary', 'key_point', 'aws_service')
+PASSAGE_WORDS = 60  # Transcript lines are grouped into passages of about this many words
+PASSAGE_FORMAT = 2  # Bumped when passages are built differently, so every video is indexed again
+
+# Attributes that change whenever a video's indexed content changes
+FINGERPRINT_ATTRIBUTES = (
+    'title', 'summary', 'key_points', 'aws_services', 'customer_names', 'industries',
+    'has_transcript', 'transcript_storage', 'transcript_s3_key', 'updated_date'
+)  # updated_date changes whenever the transcript is stored again
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def parse_timestamp(value):
+    """Seconds of the first "mm:ss" or "hh:mm:ss" in value, or 0 if there is none."""
+    match = TIMESTAMP_PATTERN.search(str(value or ''))
+    if not match:
+        return 0
+    first, second, third = match.groups()
+    if third is None:
+        return int(first) * 60 + int(second)
+    return int(first) * 3600 + int(second) * 60 + int(third)
+
+def format_timestamp(seconds):
+    # Same "mm:ss" format as the stored transcripts (minutes are not wrapped into hours)
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+def _text(value):
+    if isinstance(value, (list, tuple)):
+        return " ".join(_text(item) for item in value)
+    if isinstance(value, dict):
+        return " ".join(_text(item) for item in value.values())
+    return str(value or '')
+
+def item_fingerprint(item):
+    """Hash of the attributes that feed the index, used to skip unchanged videos."""
+    values = {name: item.get(name) for name in FINGERPRINT_ATTRIBUTES}
+    values['passage_format'] = PASSAGE_FORMAT
+    return hashlib.sha1(json.dumps(values, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+def transcript_entries(transcript):
+    """Yield the (seconds, text) entries of a stored "mm:ss - \"text\"" transcript.
+
+    An entry runs until the next entry starts, so two-line captions keep their second
+    line; line breaks inside the text become spaces.
+    """
+    transcript = str(transcript or '')
+    matches = list(TRANSCRIPT_ENTRY_PATTERN.finditer(transcript))
+    for n, match in enumerate(matches):
+        end = matches[n + 1].start() if n + 1 < len(matches) else len(transcript)
+        text = transcript[match.end():end].rstrip('\n')
+        if text.endswith('"'):
+            text = text[:-1]
+        yield int(match.group(1)) * 60 + int(match.group(2)), " ".join(text.split('\n'))
+
+def transcript_passages(transcript, transcript_sentences='', passage_words=PASSAGE_WORDS):
+    """Group transcript entries into (seconds, text) passages of about passage_words words.
+
+    Transcripts without timestamped entries fall back to the sentences, all at 00:00.
+    """
+    passages = []
+    lines = []
+    word_count = 0
+    passage_start = 0
+    for start, text in transcript_entries(transcript):
+        if not lines:
+            passage_start = start
+        lines.append(text)
+        word_count += len(text.split())
+        if word_count >= passage_words:
+            passages.append((passage_start, " ".join(lines)))
+            lines = []
+            word_count = 0
+    if lines:
+        passages.append((passage_start, " ".join(lines)))
+
+    if not passages and transcript_sentences:
+        for sentence in str(transcript_sentences).splitlines():
+            if not passages or len(passages[-1][1].split()) >= passage_words:
+                passages.append((0, sentence))
+            else:
+                passages[-1] = (0, passages[-1][1] + " " + sentence)
+    return passages
+
+def video_passages(item):
+    """Build the (field, seconds, text) passages indexed for one DynamoDB item."""
+    passages = []
+    overview = " ".join(_text(item.get(name)) for name in ('title', 'summary', 'customer_names', 'industries'))
+    if overview.strip():
+        passages.append(('summary', 0, overview.strip()))
+
+    for point in item.get('key_points') or []:
+        if isinstance(point, dict) and point.get('point'):
+            passages.append(('key_point', parse_timestamp(point.get('time_stamp')), str(point['point'])))
+
+    for service in item.get('aws_services') or []:
+        if isinstance(service, dict) and service.get('service_name'):
+            passages.append(('aws_service', parse_timestamp(service.get('time_stamp')), str(service['service_name'])))
+
+    for seconds, text in transcript_passages(item.get('transcript'), item.get('transcript_sentences')):
+        passages.append(('transcript', seconds, text))
+    return passages
+
+class SearchIndex:
+    """In-memory inverted index over video passages with BM25 ranking and phrase queries.
+
+    Every passage (a ~60 word window of the transcript, the summary, a key point or an AWS
+    service mention) is a document with a start time, so hits resolve to a video URL and a
+    "mm:ss" timestamp. Postings are kept as compact arrays of passage ids and term
+    frequencies and are scored with NumPy; a second set of postings holds every token's
+    position for phrase queries. Videos can be added, replaced and removed at any time;
+    removed passages are tombstoned and dropped by compact().
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.videos = {}  # video_url -> {'title', 'passages': [ids], 'fingerprint'}
+        self.passage_video = []
+        self.passage_text = []
+        self.passage_seconds = array('I')
+        self.passage_field = array('B')
+        self.passage_start = array('I')  # Position of each passage's first token
+        self.lengths = array('I')
+        self.live = array('b')
+        self.live_count = 0
+        self.total_tokens = 0
+        self.next_position = 0
+        self.postings = {}  # term -> (array('I') passage ids, array('H') term frequencies)
+        self.positions = {}  # token (stopwords included) -> array('I') of positions, ascending
+
+    def __len__(self):
+        return len(self.videos)
+
+    def fingerprint(self, video_url):
+        video = self.videos.get(video_url)
+        return video and video['fingerprint']
+
+    def add_video(self, video_url, title, passages, fingerprint=None):
+        """Index (field, seconds, text) passages for a video, replacing any previous version."""
+        with self.lock:
+            self.remove_video(video_url)
+            ids = []
+            for field, seconds, text in passages:
+                all_tokens = tokenize(text)
+                tokens = [token for token in all_tokens if token not in STOPWORDS]
+                passage_id = len(self.passage_video)
+                ids.append(passage_id)
+                self.passage_video.append(video_url)
+                self.passage_text.append(text)
+                self.passage_seconds.append(max(int(seconds), 0))
+                self.passage_field.append(FIELDS.index(field))
+                self.passage_start.append(self.next_position)
+                self.lengths.append(len(tokens))
+                self.live.append(1)
+                self.live_count += 1
+                self.total_tokens += len(tokens)
+                for term, count in Counter(tokens).items():
+                    posting = self.postings.get(term)
+                    if posting is None:
+                        posting = self.postings[term] = (array('I'), array('H'))
+                    posting[0].append(passage_id)
+                    posting[1].append(count if count < 65535 else 65535)
+
+                token_positions = {}
+                for position, token in enumerate(all_tokens, self.next_position):
+                    token_positions.setdefault(token, []).append(position)
+                for token, found in token_positions.items():
+                    positions = self.positions.get(token)
+                    if positions is None:
+                        positions = self.positions[token] = array('I')
+                    positions.extend(found)
+                # Leave a gap so a phrase never matches across two passages
+                self.next_position += len(all_tokens) + 1
+            self.videos[video_url] = {'title': title, 'passages': ids, 'fingerprint': fingerprint}
+
+    def remove_video(self, video_url):
+        with self.lock:
+            video = self.videos.pop(video_url, None)
+            if video is None:
+                return False
+            for passage_id in video['passages']:
+                if self.live[passage_id]:
+                    self.live[passage_id] = 0
+                    self.live_count -= 1
+                    self.total_tokens -= self.lengths[passage_id]
+            return True
+
+    def dead_ratio(self):
+        with self.lock:
+            return 1 - self.live_count / len(self.live) if len(self.live) else 0.0
+
+    def compact(self):
+        """Drop tombstoned passages and renumber the rest."""
+        import numpy as np
+        with self.lock:
+            live = np.frombuffer(self.live, dtype=np.int8).astype(bool)
+            renumber = np.cumsum(live, dtype=np.int64) - 1
+            keep_ids = np.flatnonzero(live)
+
+            postings = {}
+            for term, (ids, counts) in self.postings.items():
+                ids = np.frombuffer(ids, dtype=np.uint32)
+                keep = live[ids]
+                if keep.any():
+                    postings[term] = (
+                        array('I', renumber[ids[keep]].astype(np.uint32).tobytes()),
+                        array('H', np.frombuffer(counts, dtype=np.uint16)[keep].tobytes())
+                    )
+            self.postings = postings
+
+            # Kept passages are packed together, so their positions shift down
+            starts = np.frombuffer(self.passage_start, dtype=np.uint32).astype(np.int64)
+            sizes = np.diff(np.append(starts, self.next_position))
+            new_starts = np.cumsum(np.where(live, sizes, 0)) - sizes
+            shift = starts - new_starts
+            positions = {}
+            for token, found in self.positions.items():
+                found = np.frombuffer(found, dtype=np.uint32).astype(np.int64)
+                owner = np.searchsorted(starts, found, side='right') - 1
+                keep = live[owner]
+                if keep.any():
+                    positions[token] = array('I', (found[keep] - shift[owner[keep]]).astype(np.uint32).tobytes())
+            self.positions = positions
+            self.next_position = int(sizes[live].sum())
+
+            self.passage_video = [self.passage_video[i] for i in keep_ids]
+            self.passage_text = [self.passage_text[i] for i in keep_ids]
+            self.passage_seconds = array('I', np.frombuffer(self.passage_seconds, dtype=np.uint32)[keep_ids].tobytes())
+            self.passage_field = array('B', np.frombuffer(self.passage_field, dtype=np.uint8)[keep_ids].tobytes())
+            self.passage_start = array('I', new_starts[keep_ids].astype(np.uint32).tobytes())
+            self.lengths = array('I', np.frombuffer(self.lengths, dtype=np.uint32)[keep_ids].tobytes())
+            self.live = array('b', [1]) * len(keep_ids)
+            for video in self.videos.values():
+                video['passages'] = [int(renumber[i]) for i in video['passages']]
+
+    def _phrase_passages(self, phrase):
+        # Passages holding the phrase: anchor on the rarest token's positions and keep the
+        # ones where every other token sits at the right offset
+        import numpy as np
+        lists = []
+        for offset, token in enumerate(phrase):
+            found = self.positions.get(token)
+            if found is None:
+                return np.zeros(0, dtype=np.int64)
+            lists.append((len(found), offset, np.frombuffer(found, dtype=np.uint32)))
+        lists.sort(key=lambda entry: entry[0])
+
+        _, anchor_offset, anchor = lists[0]
+        starts = anchor[anchor >= anchor_offset] - np.uint32(anchor_offset)
+        for _, offset, found in lists[1:]:
+            wanted = starts + np.uint32(offset)
+            if wanted.size * 16 < found.size:
+                # Few candidates: binary search them in the long position list
+                index = np.minimum(np.searchsorted(found, wanted), found.size - 1)
+                starts = starts[found[index] == wanted]
+            else:
+                # Both sides are sorted, which makes intersect1d's sort a cheap merge
+                starts = np.intersect1d(wanted, found, assume_unique=True) - np.uint32(offset)
+            if not starts.size:
+                break
+
+        # Starts are sorted, so their passages are too and duplicates are adjacent
+        passage_start = np.frombuffer(self.passage_start, dtype=np.uint32)
+        owners = np.searchsorted(passage_start, starts, side='right') - 1
+        return owners[np.concatenate(([True], owners[1:] != owners[:-1]))] if owners.size else owners
+
+    def _scores(self, terms, phrases):
+        # Returns (passage ids, BM25 scores) of the live passages matching the query
+        import numpy as np
+        passage_count = len(self.live)
+        live = np.frombuffer(self.live, dtype=np.int8).view(bool)
+        lengths = np.frombuffer(self.lengths, dtype=np.uint32)
+        average_length = self.total_tokens / max(self.live_count, 1)
+
+        def live_frequency(ids):
+            # Removed passages stay in the postings until compact(), but must not count here
+            return int(np.count_nonzero(live[ids])) if self.live_count < passage_count else len(ids)
+
+        def bm25(ids, counts, document_frequency):
+            counts = counts.astype(np.float32)
+            idf = math.log(1 + (self.live_count - document_frequency + 0.5) / (document_frequency + 0.5))
+            norm = self.K1 * (1 - self.B + self.B * lengths[ids] / average_length)
+            return idf * counts * (self.K1 + 1) / (counts + norm)
+
+        if phrases:
+            # Every phrase must occur, so score only the passages that hold all of them; the
+            # other words only add to the score
+            candidates = None
+            for phrase in phrases:
+                found = self._phrase_passages(phrase)
+                candidates = found if candidates is None else np.intersect1d(candidates, found, assume_unique=True)
+            candidates = candidates[live[candidates]]
+            scores = np.zeros(len(candidates), dtype=np.float32)
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                ids = np.frombuffer(posting[0], dtype=np.uint32)
+                index = np.minimum(np.searchsorted(ids, candidates), len(ids) - 1)
+                present = ids[index] == candidates
+                counts = np.frombuffer(posting[1], dtype=np.uint16)[index[present]]
+                scores[present] += bm25(candidates[present], counts, live_frequency(ids))
+            return candidates, scores
+
+        # Dense accumulators, but only the passages holding a query term are touched, so the
+        # cost follows the posting lengths rather than the corpus size
+        scores = np.zeros(passage_count, dtype=np.float32)
+        matched = np.zeros(passage_count, dtype=bool)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                continue
+            ids = np.frombuffer(posting[0], dtype=np.uint32)
+            scores[ids] += bm25(ids, np.frombuffer(posting[1], dtype=np.uint16), live_frequency(ids))
+            matched[ids] = True
+        matched &= live
+        candidates = np.flatnonzero(matched)
+        return candidates, scores[candidates]
+
+    def search(self, query, k=10, per_video=None):
+        """Return the top k hits for query, best first.
+
+        Words are ranked with BM25; text in double quotes must appear as an exact phrase.
+        Each hit is a dict with video_url, title, timestamp ("mm:ss"), seconds, field,
+        score and the passage text. per_video caps the hits returned for one video.
+        """
+        import numpy as np
+        phrases = [tokenize(phrase) for phrase in PHRASE_PATTERN.findall(query)]
+        phrases = [phrase for phrase in phrases if phrase]
+        words = tokenize(PHRASE_PATTERN.sub(' ', query)) + [token for phrase in phrases for token in phrase]
+        terms = list(dict.fromkeys(token for token in words if token not in STOPWORDS))
+        if not terms and not phrases:
+            return []
+
+        with self.lock:
+            candidates, scores = self._scores(terms, phrases)
+
+            hits = []
+            per_video_count = Counter()
+            batch = k * 4 if per_video else k
+            while candidates.size:
+                # Take the best remaining candidates without sorting all of them
+                if candidates.size > batch:
+                    top = np.argpartition(-scores, batch)[:batch]
+                    top = top[np.argsort(-scores[top], kind='stable')]
+                    chosen, chosen_scores = candidates[top], scores[top]
+                    candidates, scores = np.delete(candidates, top), np.delete(scores, top)
+                else:
+                    order = np.argsort(-scores, kind='stable')
+                    chosen, chosen_scores = candidates[order], scores[order]
+                    candidates = candidates[:0]
+
+                for n, passage_id in enumerate(chosen):
+                    video_url = self.passage_video[passage_id]
+                    if per_video and per_video_count[video_url] >= per_video:
+                        continue
+                    per_video_count[video_url] += 1
+                    seconds = self.passage_seconds[passage_id]
+                    hits.append({
+                        'video_url': video_url,
+                        'title': self.videos[video_url]['title'],
+                        'timestamp': format_timestamp(seconds),
+                        'seconds': seconds,
+                        'field': FIELDS[self.passage_field[passage_id]],
+                        'score': float(chosen_scores[n]),
+                        'text': self.passage_text[passage_id]
+                    })
+                    if len(hits) == k:
+                        return hits
+                batch *= 4
+            return hits
+
+    def save(self, path):
+        """Write the index to path atomically (pickle; only load files you wrote)."""
+        with self.lock:
+            state = {name: value for name, value in self.__dict__.items() if name != 'lock'}
+            with atomic_open(path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with save(), or return an empty one if path doesn't exist."""
+        index = cls()
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                index.__dict__.update(pickle.load(f))
+        return index
@@ -0,0 +1,47 @@
+import json
+import os
+import threading
+import time
+
+from atomic_file import atomic_write
+
+class SeenVideoIds:
+    """Persistent set of the video IDs met by earlier crawls of a channel.
+
+    Channel pages list videos newest first, so once a crawl meets a run of IDs it has
+    already seen, everything after them is known too. IDs added during a crawl are kept
+    apart until save(), which callers invoke once the new videos have been handled.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.ids = set()
+        self.added = set()  # IDs met by this crawl and not saved yet
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.ids = set(json.load(f).get('video_ids', []))
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable seen video list {path}: {e}")
+
+    def __contains__(self, video_id):
+        with self.lock:
+            return video_id in self.ids
+
+    def __len__(self):
+        with self.lock:
+            return len(self.ids | self.added)
+
+    def add(self, video_id):
+        """Record a video met by the current crawl; it counts as seen once saved."""
+        with self.lock:
+            if video_id not in self.ids:
+                self.added.add(video_id)
+
+    def save(self):
+        with self.lock:
+            self.ids |= self.added
+            self.added = set()
+            body = json.dumps({'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'), 'video_ids': sorted(self.ids)})
+            atomic_write(self.path, body, durable=True)
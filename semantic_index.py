@@ -0,0 +1,421 @@
+import json
+import math
+import os
+import pickle
+import threading
+import zlib
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from atomic_file import atomic_open
+from bedrock_governor import estimate_tokens
+from metrics import metrics
+from search_index import format_timestamp, tokenize
+
+class HashingEmbedder:
+    """Deterministic local embeddings: signed feature hashing of words and word pairs.
+
+    No model and no network, so offline runs and tests get stable vectors. It captures
+    word overlap only, not meaning; use BedrockEmbedder for real semantic search.
+    """
+
+    def __init__(self, dimensions=512):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def _embed_one(self, text):
+        import numpy as np
+        tokens = tokenize(text)
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        if not features:
+            return np.zeros(self.dimensions, dtype=np.float32)
+        hashes = np.array([zlib.crc32(feature.encode('utf-8')) for feature in features], dtype=np.uint64)
+        signs = np.where(hashes >> np.uint64(31) & np.uint64(1), 1.0, -1.0)
+        vector = np.bincount((hashes % np.uint64(self.dimensions)).astype(np.int64), weights=signs, minlength=self.dimensions)
+        vector = np.sign(vector) * np.log1p(np.abs(vector))  # Damp repeated words
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).astype(np.float32)
+
+    def embed(self, texts, purpose='document'):
+        import numpy as np
+        return np.vstack([self._embed_one(text) for text in texts]) if texts else np.zeros((0, self.dimensions), dtype=np.float32)
+
+class BedrockEmbedder:
+    """Embeddings from a Bedrock model (Amazon Titan Text Embeddings v2 or Cohere Embed).
+
+    Titan takes one text per request, so texts are embedded on a small thread pool; Cohere
+    takes up to 96 texts per request. Every request goes through the governor, which
+    paces calls to the model's tokens-per-minute quota and backs off when throttled.
+    Vectors are L2-normalized so dot products are cosine similarities.
+    """
+
+    COHERE_BATCH = 96
+
+    def __init__(self, bedrock_client, model_id, dimensions, governor, workers=8, retries=5):
+        self.bedrock_client = bedrock_client
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.governor = governor
+        self.workers = workers
+        self.retries = retries
+        self.name = f"bedrock:{model_id}:{dimensions}"
+
+    def _invoke(self, body, estimated_tokens):
+        for attempt in range(self.retries):
+            reserved_tokens = self.governor.acquire(estimated_tokens)
+            throttled = False
+            try:
+                response = self.bedrock_client.invoke_model(body=json.dumps(body), modelId=self.model_id)
+                return json.loads(response.get('body').read())
+            except Exception as e:
+                if "ThrottlingException" in str(e) or "Too many" in str(e):
+                    throttled = True
+                    metrics.increment('retries', component='bedrock_embeddings')
+                    print(f"Embedding request throttled (attempt {attempt + 1}/{self.retries}), backing off...")
+                elif attempt + 1 == self.retries:
+                    raise
+                else:
+                    print(f"Embedding request failed (attempt {attempt + 1}/{self.retries}): {e}")
+            finally:
+                self.governor.release(reserved_tokens, None, throttled)
+        raise RuntimeError(f"Embedding request to {self.model_id} failed after {self.retries} attempts")
+
+    def _embed_titan(self, text):
+        body = {"inputText": text, "dimensions": self.dimensions, "normalize": True}
+        return self._invoke(body, estimate_tokens(text))['embedding']
+
+    def _embed_cohere(self, texts, purpose):
+        body = {"texts": texts, "input_type": "search_query" if purpose == 'query' else "search_document", "truncate": "END"}
+        return self._invoke(body, sum(estimate_tokens(text) for text in texts))['embeddings']
+
+    def embed(self, texts, purpose='document'):
+        """Return an (n, dimensions) float32 matrix; purpose is 'document' or 'query'."""
+        import numpy as np
+        if not texts:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        if self.model_id.startswith('cohere.'):
+            batches = [texts[i:i + self.COHERE_BATCH] for i in range(0, len(texts), self.COHERE_BATCH)]
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                vectors = [vector for batch in executor.map(lambda batch: self._embed_cohere(batch, purpose), batches) for vector in batch]
+        else:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                vectors = list(executor.map(self._embed_titan, texts))
+
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+class VectorIndex:
+    """Chunk embeddings in a memory-mapped float32 matrix with exact and approximate top-k.
+
+    Row i of the matrix file is the embedding of one transcript chunk; metadata (owning
+    video, start time, a text preview, the matrix file's name) lives in index.pkl, whose
+    atomic replacement by save() is the commit point. The matrix grows by doubling and is
+    only paged in as queries touch it. Exact queries score the matrix block by block with
+    one matrix product per block, for any number of queries at once. build_ann() adds an
+    IVF index (k-means cells) so large corpora only score the rows of the nearest cells.
+    """
+
+    BLOCK_ROWS = 65536
+    PREVIEW_CHARS = 300
+
+    def __init__(self, directory, dimensions, embedder_name):
+        self.directory = directory
+        self.lock = threading.RLock()
+        self.meta_path = os.path.join(directory, 'index.pkl')
+        os.makedirs(directory, exist_ok=True)
+
+        self.meta = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, 'rb') as f:
+                meta = pickle.load(f)
+            if meta['dimensions'] == dimensions and meta['embedder'] == embedder_name:
+                self.meta = meta
+            else:
+                print(f"Semantic index was built with {meta['embedder']} ({meta['dimensions']} dimensions), "
+                      f"starting over with {embedder_name} ({dimensions} dimensions).")
+        if self.meta is None:
+            self.meta = {
+                'dimensions': dimensions, 'embedder': embedder_name, 'rows': 0, 'capacity': 0,
+                'row_video': [], 'row_seconds': array('I'), 'row_preview': [], 'live': array('b'),
+                'live_count': 0, 'videos': {}, 'centroids': None, 'cell_rows': None, 'ann_rows': 0,
+                'matrix_file': 'vectors.f32', 'matrix_version': 0
+            }
+            self._remove_matrices()
+        # Indexes saved before compaction versioned the matrix all use vectors.f32
+        self.meta.setdefault('matrix_file', 'vectors.f32')
+        self.meta.setdefault('matrix_version', 0)
+        self.matrix_path = os.path.join(directory, self.meta['matrix_file'])
+        self.vectors = self._open(self.meta['capacity'])
+
+    def _open(self, capacity):
+        import numpy as np
+        if capacity == 0:
+            return np.zeros((0, self.meta['dimensions']), dtype=np.float32)
+        with open(self.matrix_path, 'ab') as f:
+            f.truncate(capacity * self.meta['dimensions'] * 4)
+        return np.memmap(self.matrix_path, dtype=np.float32, mode='r+', shape=(capacity, self.meta['dimensions']))
+
+    def _remove_matrices(self, keep=None):
+        # Matrix files other than keep: replaced by a compaction, or left by an interrupted one
+        for name in os.listdir(self.directory):
+            if name.startswith('vectors') and name.endswith('.f32') and name != keep:
+                os.remove(os.path.join(self.directory, name))
+
+    def _reserve(self, rows):
+        # Grow the file by doubling so appends stay amortized O(1)
+        import numpy as np
+        needed = self.meta['rows'] + rows
+        if needed <= self.meta['capacity']:
+            return
+        capacity = max(needed, self.meta['capacity'] * 2, 1024)
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        self.vectors = None
+        self.vectors = self._open(capacity)
+        self.meta['capacity'] = capacity
+
+    def __len__(self):
+        return len(self.meta['videos'])
+
+    @property
+    def videos(self):
+        # video_url -> {'title', 'rows': [row numbers], 'fingerprint'}
+        return self.meta['videos']
+
+    def fingerprint(self, video_url):
+        video = self.meta['videos'].get(video_url)
+        return video and video['fingerprint']
+
+    def add_video(self, video_url, title, chunks, vectors, fingerprint=None):
+        """Store the (seconds, text) chunks of a video with their embeddings, replacing older ones."""
+        import numpy as np
+        meta = self.meta
+        with self.lock:
+            self.remove_video(video_url)
+            self._reserve(len(chunks))
+            start = meta['rows']
+            self.vectors[start:start + len(chunks)] = vectors
+            for n, (seconds, text) in enumerate(chunks):
+                meta['row_video'].append(video_url)
+                meta['row_seconds'].append(max(int(seconds), 0))
+                meta['row_preview'].append(text[:self.PREVIEW_CHARS])
+                meta['live'].append(1)
+            meta['rows'] += len(chunks)
+            meta['live_count'] += len(chunks)
+            meta['videos'][video_url] = {'title': title, 'rows': list(range(start, start + len(chunks))), 'fingerprint': fingerprint}
+
+            # Rows added after the IVF cells were trained join their nearest cell
+            if meta['centroids'] is not None and len(chunks):
+                cells = np.argmax(np.asarray(vectors, dtype=np.float32) @ meta['centroids'].T, axis=1)
+                for row, cell in zip(range(start, start + len(chunks)), cells):
+                    meta['cell_rows'][cell].append(row)
+
+    def remove_video(self, video_url):
+        with self.lock:
+            video = self.meta['videos'].pop(video_url, None)
+            if video is None:
+                return False
+            for row in video['rows']:
+                if self.meta['live'][row]:
+                    self.meta['live'][row] = 0
+                    self.meta['live_count'] -= 1
+            return True
+
+    def dead_ratio(self):
+        rows = self.meta['rows']
+        return 1 - self.meta['live_count'] / rows if rows else 0.0
+
+    def compact(self):
+        """Rewrite the matrix without removed rows and renumber the metadata.
+
+        The rows go to a new matrix file; the saved index keeps using the old one until
+        save() records the new name, so a crash in between loses nothing.
+        """
+        import numpy as np
+        meta = self.meta
+        with self.lock:
+            live = np.frombuffer(meta['live'], dtype=np.int8).astype(bool)
+            keep = np.flatnonzero(live)
+            renumber = np.cumsum(live, dtype=np.int64) - 1
+
+            version = meta['matrix_version'] + 1
+            matrix_file = f"vectors-{version}.f32"
+            matrix_path = os.path.join(self.directory, matrix_file)
+            capacity = max(len(keep), 1024)
+            with open(matrix_path, 'wb') as f:
+                f.truncate(capacity * meta['dimensions'] * 4)
+            compacted = np.memmap(matrix_path, dtype=np.float32, mode='r+', shape=(capacity, meta['dimensions']))
+            for start in range(0, len(keep), self.BLOCK_ROWS):
+                rows = keep[start:start + self.BLOCK_ROWS]
+                compacted[start:start + len(rows)] = self.vectors[rows]
+            compacted.flush()
+            del compacted
+            self.vectors = None
+            meta['matrix_file'], meta['matrix_version'] = matrix_file, version
+            meta['capacity'] = capacity
+            self.matrix_path = matrix_path
+            self.vectors = self._open(capacity)
+
+            meta['row_video'] = [meta['row_video'][i] for i in keep]
+            meta['row_preview'] = [meta['row_preview'][i] for i in keep]
+            meta['row_seconds'] = array('I', np.frombuffer(meta['row_seconds'], dtype=np.uint32)[keep].tobytes())
+            meta['live'] = array('b', [1]) * len(keep)
+            meta['rows'] = len(keep)
+            for video in meta['videos'].values():
+                video['rows'] = [int(renumber[row]) for row in video['rows']]
+            if meta['cell_rows'] is not None:
+                meta['cell_rows'] = [
+                    array('I', (renumber[rows[live[rows]]]).astype(np.uint32).tobytes())
+                    for rows in (np.frombuffer(cell, dtype=np.uint32) for cell in meta['cell_rows'])
+                ]
+
+    def build_ann(self, cells=None, iterations=10, sample_rows=100000, seed=0):
+        """Train IVF cells with spherical k-means on a sample of rows and assign every row."""
+        import numpy as np
+        meta = self.meta
+        with self.lock:
+            live_rows = np.flatnonzero(np.frombuffer(meta['live'], dtype=np.int8))
+            if not live_rows.size:
+                return
+            cells = cells or max(1, int(math.sqrt(live_rows.size)))
+            rng = np.random.default_rng(seed)
+            sample = np.asarray(self.vectors[np.sort(rng.choice(live_rows, min(sample_rows, live_rows.size), replace=False))])
+            centroids = sample[rng.choice(len(sample), min(cells, len(sample)), replace=False)]
+            for _ in range(iterations):
+                assignment = np.argmax(sample @ centroids.T, axis=1)
+                for cell in range(len(centroids)):
+                    members = sample[assignment == cell]
+                    if len(members):
+                        centroid = members.sum(axis=0)
+                        centroids[cell] = centroid / (np.linalg.norm(centroid) or 1)
+
+            cell_rows = [array('I') for _ in range(len(centroids))]
+            for start in range(0, live_rows.size, self.BLOCK_ROWS):
+                rows = live_rows[start:start + self.BLOCK_ROWS]
+                for row, cell in zip(rows, np.argmax(self.vectors[rows] @ centroids.T, axis=1)):
+                    cell_rows[cell].append(int(row))
+            meta['centroids'] = centroids.astype(np.float32)
+            meta['cell_rows'] = cell_rows
+            meta['ann_rows'] = int(live_rows.size)
+            print(f"Semantic index: trained {len(centroids)} IVF cells over {live_rows.size} rows")
+
+    def ann_is_stale(self, min_rows):
+        """True when the corpus has min_rows chunks and no IVF cells, or has doubled since training."""
+        live_count = self.meta['live_count']
+        return live_count >= min_rows and (self.meta['centroids'] is None or live_count > 2 * self.meta['ann_rows'])
+
+    @staticmethod
+    def _best(rows, scores, k):
+        # The k highest scores, best first, without sorting everything
+        import numpy as np
+        if scores.size > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.argsort(-scores, kind='stable')
+        return rows[order], scores[order]
+
+    def _top_rows(self, queries, k, probes):
+        # Returns one (rows, scores) pair per query, best first
+        import numpy as np
+        meta = self.meta
+        live = np.frombuffer(meta['live'], dtype=np.int8).view(bool)
+
+        if probes and meta['centroids'] is not None:
+            # Approximate: only the rows in each query's nearest cells are scored
+            results = []
+            nearest_cells = np.argsort(-(queries @ meta['centroids'].T), axis=1)[:, :probes]
+            for query, cells in zip(queries, nearest_cells):
+                rows = np.sort(np.concatenate([np.frombuffer(meta['cell_rows'][cell], dtype=np.uint32) for cell in cells]))
+                rows = rows[live[rows]].astype(np.int64)
+                results.append(self._best(rows, np.asarray(self.vectors[rows]) @ query, k))
+            return results
+
+        # Exact: one matrix product per block of rows for all queries at once, keeping a
+        # running top k per query
+        best = [(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)) for _ in queries]
+        for start in range(0, meta['rows'], self.BLOCK_ROWS):
+            end = min(start + self.BLOCK_ROWS, meta['rows'])
+            block_live = live[start:end]
+            if not block_live.any():
+                continue
+            # Score the whole block in place (no copy of the rows), then drop the dead ones
+            block_scores = queries @ np.asarray(self.vectors[start:end]).T
+            rows = np.arange(start, end)
+            if not block_live.all():
+                rows, block_scores = rows[block_live], block_scores[:, block_live]
+            best = [
+                self._best(np.concatenate([best_rows, rows]), np.concatenate([best_scores, scores]), k)
+                for (best_rows, best_scores), scores in zip(best, block_scores)
+            ]
+        return best
+
+    def search(self, query_vectors, k=10, probes=None, per_video=None):
+        """Return the top k chunks for each query vector.
+
+        query_vectors is one vector or a (queries, dimensions) matrix; the result is a list
+        of hits for one vector and a list of lists for a matrix. probes > 0 uses the IVF
+        index if one was built. per_video caps the hits returned for one video.
+        """
+        import numpy as np
+        queries = np.asarray(query_vectors, dtype=np.float32)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries)
+
+        with self.lock:
+            if not self.meta['live_count']:
+                return [] if single else [[] for _ in queries]
+            # Fetch extra rows when several chunks of one video may be dropped
+            fetch = min(k * 10 if per_video else k, self.meta['live_count'])
+            top_rows = self._top_rows(queries, fetch, probes)
+
+            results = []
+            for rows, scores in top_rows:
+                hits = []
+                per_video_count = {}
+                for row, score in zip(rows, scores):
+                    video_url = self.meta['row_video'][row]
+                    if per_video and per_video_count.get(video_url, 0) >= per_video:
+                        continue
+                    per_video_count[video_url] = per_video_count.get(video_url, 0) + 1
+                    seconds = self.meta['row_seconds'][row]
+                    hits.append({
+                        'video_url': video_url,
+                        'title': self.meta['videos'][video_url]['title'],
+                        'timestamp': format_timestamp(seconds),
+                        'seconds': seconds,
+                        'score': float(score),
+                        'text': self.meta['row_preview'][row]
+                    })
+                    if len(hits) == k:
+                        break
+                results.append(hits)
+        return results[0] if single else results
+
+    def video_vector(self, video_url):
+        """Mean of a video's chunk embeddings, normalized; None for an unknown video."""
+        import numpy as np
+        with self.lock:
+            video = self.meta['videos'].get(video_url)
+            if not video or not video['rows']:
+                return None
+            vector = np.asarray(self.vectors[video['rows']]).mean(axis=0)
+            return vector / (np.linalg.norm(vector) or 1)
+
+    def similar_videos(self, video_url, k=10, probes=None):
+        """Videos whose chunks are closest to the given video as a whole, best first."""
+        vector = self.video_vector(video_url)
+        if vector is None:
+            return []
+        hits = self.search(vector, k=k + 1, probes=probes, per_video=1)
+        return [hit for hit in hits if hit['video_url'] != video_url][:k]
+
+    def save(self):
+        """Flush the matrix, write the metadata atomically, then delete replaced matrix files."""
+        import numpy as np
+        with self.lock:
+            if isinstance(self.vectors, np.memmap):
+                self.vectors.flush()
+            with atomic_open(self.meta_path, 'wb', durable=True) as f:
+                pickle.dump(self.meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._remove_matrices(keep=self.meta['matrix_file'])
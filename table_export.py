@@ -0,0 +1,183 @@
+import decimal
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+def to_json_value(value):
+    """Convert a value read through boto3's resource API into plain JSON types.
+
+    Numbers come back as Decimal and string/number sets as Python sets; lists and maps
+    (key_points, presenter_details, aws_services, ...) keep their nested structure.
+    Binary attributes are dropped.
+    """
+    if isinstance(value, decimal.Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, dict):
+        return {key: to_json_value(item) for key, item in value.items() if not _is_binary(item)}
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value if not _is_binary(item)]
+    if isinstance(value, (set, frozenset)):
+        return sorted(to_json_value(item) for item in value)
+    return value
+
+def _is_binary(value):
+    return isinstance(value, (bytes, bytearray)) or hasattr(value, 'value') and isinstance(value.value, bytes)
+
+class PartitionedJsonlExporter:
+    """Stream table items into gzip-compressed JSON Lines files partitioned by one attribute.
+
+    Every export writes under its own run prefix, laid out Hive-style inside it
+    (`prefix/run=20241206T120000Z-1a2b3c/event_year=2024/part-00000.jsonl.gz`) so Athena, Glue or
+    pandas can read a partition without listing the others. Each partition has one open
+    file on local disk at a time; it is uploaded and deleted once it holds rows_per_file
+    rows, so memory and disk stay bounded whatever the table size. close() uploads the
+    last files and, only if every row and file succeeded, publishes the run by writing the
+    pointer object `prefix/LATEST.json` and then deletes the earlier runs. A failed or
+    interrupted export never touches the published one.
+    """
+
+    POINTER_NAME = 'LATEST.json'
+
+    def __init__(self, s3_client, bucket, prefix, partition_by, rows_per_file=50000):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{uuid.uuid4().hex[:6]}"
+        self.run_prefix = f"{prefix}run={self.run_id}/"
+        self.pointer_key = f"{prefix}{self.POINTER_NAME}"
+        self.partition_by = partition_by
+        self.rows_per_file = rows_per_file
+        self.lock = threading.Lock()
+        self.partitions = {}  # partition value -> {'lock', 'file', 'path', 'rows', 'parts'}
+        self.written_keys = set()
+        self.stats = {'rows': 0, 'failed_rows': 0, 'files': 0, 'failed_files': 0, 'bytes_uploaded': 0, 'stale_deleted': 0}
+        self.start_time = time.time()
+
+    def _partition(self, value):
+        with self.lock:
+            partition = self.partitions.get(value)
+            if partition is None:
+                partition = {'lock': threading.Lock(), 'file': None, 'path': None, 'rows': 0, 'parts': 0}
+                self.partitions[value] = partition
+            return partition
+
+    def write(self, item):
+        """Append one item as a JSON line to the file of its partition."""
+        value = item.get(self.partition_by)
+        value = 'unknown' if value in (None, '') else str(to_json_value(value))
+        line = (json.dumps(to_json_value(item), ensure_ascii=False, sort_keys=True) + "\n").encode('utf-8')
+
+        partition = self._partition(value)
+        full = None
+        with partition['lock']:
+            try:
+                if partition['file'] is None:
+                    fd, partition['path'] = tempfile.mkstemp(suffix='.jsonl.gz')
+                    partition['file'] = gzip.GzipFile(fileobj=os.fdopen(fd, 'wb'), mode='wb')
+                partition['file'].write(line)
+            except Exception:
+                with self.lock:
+                    self.stats['failed_rows'] += 1
+                raise
+            partition['rows'] += 1
+            if partition['rows'] >= self.rows_per_file:
+                full = self._detach(value, partition)
+
+        with self.lock:
+            self.stats['rows'] += 1
+        if full:
+            self._upload(*full)
+
+    def _detach(self, value, partition):
+        # Close the partition's current file and hand it back for upload
+        raw = partition['file'].fileobj
+        partition['file'].close()
+        raw.close()
+        key = f"{self.run_prefix}{self.partition_by}={value}/part-{partition['parts']:05d}.jsonl.gz"
+        full = (partition['path'], key, partition['rows'])
+        partition['file'] = None
+        partition['path'] = None
+        partition['rows'] = 0
+        partition['parts'] += 1
+        return full
+
+    def _upload(self, path, key, rows):
+        try:
+            size = os.path.getsize(path)
+            self.s3_client.upload_file(
+                path, self.bucket, key,
+                ExtraArgs={'ContentType': 'application/x-ndjson', 'ContentEncoding': 'gzip'}
+            )
+        except Exception as e:
+            with self.lock:
+                self.stats['failed_files'] += 1
+            print(f"Error exporting {rows} rows to {key}: {e}")
+            return
+        finally:
+            os.remove(path)
+        with self.lock:
+            self.written_keys.add(key)
+            self.stats['files'] += 1
+            self.stats['bytes_uploaded'] += size
+        print(f"Exported {rows} rows to s3://{self.bucket}/{key}")
+
+    def _list_keys(self):
+        keys = []
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            keys.extend(obj['Key'] for obj in page.get('Contents', []))
+        return keys
+
+    def _delete(self, keys):
+        for start in range(0, len(keys), 1000):  # DeleteObjects takes at most 1000 keys
+            objects = [{'Key': key} for key in keys[start:start + 1000]]
+            self.s3_client.delete_objects(Bucket=self.bucket, Delete={'Objects': objects, 'Quiet': True})
+
+    def _publish(self):
+        # The pointer is the commit point: readers switch to this run only once all of it is in S3
+        pointer = {
+            'run_id': self.run_id,
+            'prefix': self.run_prefix,
+            'partition_by': self.partition_by,
+            'rows': self.stats['rows'],
+            'files': sorted(self.written_keys),
+            'exported_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+        }
+        self.s3_client.put_object(
+            Bucket=self.bucket, Key=self.pointer_key,
+            Body=json.dumps(pointer, indent=2).encode('utf-8'), ContentType='application/json'
+        )
+
+        # Earlier runs, and the leftovers of interrupted ones, are no longer referenced
+        stale = [key for key in self._list_keys() if key != self.pointer_key and not key.startswith(self.run_prefix)]
+        self._delete(stale)
+        self.stats['stale_deleted'] = len(stale)
+
+    def close(self, publish=True):
+        """Upload the remaining files, publish the run if it is complete, and return the counters.
+
+        With publish=False (the table wasn't fully read), or when any row or upload failed,
+        the files of this run are deleted and the previous export stays published.
+        """
+        for value, partition in list(self.partitions.items()):
+            with partition['lock']:
+                full = self._detach(value, partition) if partition['file'] is not None else None
+            if full:
+                self._upload(*full)
+
+        published = publish and not self.stats['failed_rows'] and not self.stats['failed_files']
+        if published:
+            self._publish()
+        else:
+            self._delete(sorted(self.written_keys))
+            print(f"Table export incomplete: kept the previous export, removed {len(self.written_keys)} files of this run")
+
+        elapsed = time.time() - self.start_time
+        print(f"Table export: {self.stats['rows']} rows in {self.stats['files']} files across "
+              f"{len(self.partitions)} partitions, {self.stats['bytes_uploaded']} bytes, "
+              f"{self.stats['failed_rows']} rows and {self.stats['failed_files']} files failed, {self.stats['stale_deleted']} stale files removed in {elapsed:.1f}s")
+        return dict(self.stats, published=published)
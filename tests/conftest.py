@@ -0,0 +1,24 @@
+import os
+import sys
+
+import pytest
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.join(REPO, 'benchmarks'))  # fakes.py: stand-ins for YouTube and AWS
+
+@pytest.fixture(scope='session')
+def assistant(tmp_path_factory):
+    """The youtube_ai_assistant module, imported in a scratch directory.
+
+    The log file, caches and checkpoints are relative paths, and boto3 clients need a
+    region; no AWS call is made at import.
+    """
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'us-west-2')
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('assistant'))
+    try:
+        import youtube_ai_assistant
+        yield youtube_ai_assistant
+    finally:
+        os.chdir(cwd)
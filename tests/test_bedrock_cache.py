@@ -0,0 +1,40 @@
+import os
+import time
+
+from bedrock_cache import BedrockResponseCache, make_cache_key
+
+def key(prompt, temperature=0.5):
+    return make_cache_key('anthropic.claude-3-5-sonnet', 4096, temperature, 0.9, prompt)
+
+def test_key_covers_the_prompt_and_inference_parameters():
+    assert key("summarize this") == key("summarize this")
+    assert key("summarize this") != key("summarize that")
+    assert key("summarize this") != key("summarize this", temperature=0.0)
+
+def test_entries_survive_a_restart(tmp_path):
+    cache = BedrockResponseCache(str(tmp_path), 10 ** 6)
+    assert cache.get(key("a")) is None
+    cache.put(key("a"), "```json\n{}\n```", {'summary': "a"})
+
+    reopened = BedrockResponseCache(str(tmp_path), 10 ** 6)
+    assert reopened.get(key("a")) == {'completion': "```json\n{}\n```", 'parsed': {'summary': "a"}}
+    assert reopened.report()['entries'] == 1
+    assert cache.report()['hit_rate'] == 0.0
+    assert reopened.report()['hit_rate'] == 1.0
+
+def test_least_recently_used_entries_are_evicted_over_the_size_limit(tmp_path):
+    completion = "x" * 400
+    cache = BedrockResponseCache(str(tmp_path), 1000)
+    cache.put(key("a"), completion)
+    time.sleep(0.01)
+    cache.put(key("b"), completion)
+    time.sleep(0.01)
+    cache.get(key("a"))  # Now "b" is the least recently used
+    time.sleep(0.01)
+    cache.put(key("c"), completion)
+
+    assert cache.get(key("b")) is None
+    assert cache.get(key("a"))['completion'] == completion
+    assert cache.get(key("c"))['completion'] == completion
+    assert cache.report()['evictions'] == 1
+    assert not os.path.exists(cache._paths(key("b"))[0])
@@ -0,0 +1,72 @@
+import threading
+import time
+
+from bedrock_governor import BedrockGovernor
+
+def test_throttle_halves_concurrency_and_cuts_the_rate():
+    governor = BedrockGovernor(60000, 8)
+    reserved = governor.acquire(1000)
+    governor.release(reserved, throttled=True)
+    report = governor.report()
+    assert report['concurrency_limit'] == 4
+    assert report['tokens_per_minute'] == 42000
+    assert report['throttles'] == 1
+    assert governor.tokens == 0.0  # The bucket is emptied
+
+def test_limits_never_drop_below_their_floors():
+    governor = BedrockGovernor(60000, 4, min_concurrency=2)
+    for _ in range(10):
+        governor.in_flight += 1
+        governor.release(0, throttled=True)
+    report = governor.report()
+    assert report['concurrency_limit'] == 2
+    assert report['tokens_per_minute'] == 6000  # A tenth of the ceiling by default
+
+def test_successes_grow_the_limits_back_up_to_the_ceilings():
+    governor = BedrockGovernor(60000, 4)
+    governor.in_flight += 1
+    governor.release(0, throttled=True)
+    assert governor.report()['concurrency_limit'] == 2
+
+    # Additive increase: about one slot per `limit` successes
+    for _ in range(3):
+        governor.in_flight += 1
+        governor.release(0)
+    assert governor.report()['concurrency_limit'] == 3
+    for _ in range(100):
+        governor.in_flight += 1
+        governor.release(0)
+    report = governor.report()
+    assert report['concurrency_limit'] == 4
+    assert report['tokens_per_minute'] == 60000
+
+def test_real_usage_settles_the_reservation():
+    governor = BedrockGovernor(60000, 4)
+    governor.tokens = 10000.0
+    reserved = governor.acquire(4000)
+    governor.release(reserved, used_tokens=1000)
+    assert 9000 <= governor.tokens < 9100  # 3000 of the 4000 refunded, plus the refill meanwhile
+    assert governor.report()['tokens'] == 1000
+
+def test_acquire_waits_for_a_free_slot():
+    governor = BedrockGovernor(600000, 1)
+    reserved = governor.acquire(10)
+    acquired = threading.Event()
+
+    def second_request():
+        governor.release(governor.acquire(10))
+        acquired.set()
+
+    thread = threading.Thread(target=second_request)
+    thread.start()
+    assert not acquired.wait(0.1)
+    governor.release(reserved)
+    assert acquired.wait(2)
+    thread.join()
+
+def test_acquire_waits_for_the_bucket_to_refill():
+    governor = BedrockGovernor(60000, 4)  # 1000 tokens a second
+    governor.tokens = 0.0
+    start = time.monotonic()
+    governor.release(governor.acquire(200))
+    assert time.monotonic() - start >= 0.15
@@ -0,0 +1,47 @@
+import decimal
+import json
+import os
+
+from checkpoint import CURSOR_COMPLETE, Checkpoint
+
+def test_interrupted_run_resumes(tmp_path):
+    path = str(tmp_path / 'action.json')
+    first = Checkpoint(path, interval=3600)
+    assert not first.resumed
+    assert first.start('a', {'url': 'a'})
+    assert first.start('b', {'url': 'b', 'view_count': decimal.Decimal('12')})
+    first.finish('a')
+    first.set_cursor('scan 0', {'video_url': 'a'})
+    first.set_cursor('scan 1', CURSOR_COMPLETE)
+    first.save()
+
+    second = Checkpoint(path)
+    assert second.resumed
+    assert second.pending_items() == [{'url': 'b', 'view_count': 12}]
+    assert second.cursor('scan 0') == {'video_url': 'a'}
+    assert second.cursor('scan 1') == CURSOR_COMPLETE
+    assert not second.start('a', {'url': 'a'})  # Done before the interruption
+    assert second.start('b', {'url': 'b'})  # Redone once
+    assert not second.start('b', {'url': 'b'})
+
+def test_progress_is_saved_by_interval(tmp_path):
+    path = str(tmp_path / 'action.json')
+    checkpoint = Checkpoint(path, interval=0)
+    checkpoint.start('a', {'url': 'a'})
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['in_flight'] == {'a': {'url': 'a'}}
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+def test_complete_starts_the_next_run_over(tmp_path):
+    path = str(tmp_path / 'action.json')
+    checkpoint = Checkpoint(path)
+    checkpoint.start('a', {'url': 'a'})
+    checkpoint.save()
+    checkpoint.complete()
+    assert not os.path.exists(path)
+    assert not Checkpoint(path).resumed
+
+def test_unreadable_checkpoint_is_ignored(tmp_path):
+    path = tmp_path / 'action.json'
+    path.write_text('{"cursors": ')
+    assert not Checkpoint(str(path)).resumed
@@ -0,0 +1,46 @@
+import json
+import os
+
+import fakes
+import pytest
+
+@pytest.fixture
+def stubbed(assistant, monkeypatch, tmp_path):
+    recording = str(tmp_path / 'recording')
+    fakes.write_synthetic_recording(recording, 12, per_page=5, transcript_minutes=10)
+    table = fakes.FakeTable()
+    youtube = fakes.RecordedYouTube(recording, assistant.CHANNEL_PATH)
+    monkeypatch.setattr(assistant, 'table', table)
+    monkeypatch.setattr(assistant.write_buffer, 'table', table)
+    monkeypatch.setattr(assistant, 'dynamodb', fakes.FakeDynamoDB({assistant.TABLE_NAME: table}))
+    monkeypatch.setattr(assistant, 's3_client', fakes.FakeS3())
+    monkeypatch.setattr(assistant, 'youtube_client', youtube)
+    monkeypatch.setattr(assistant, 'get_youtube_client', lambda host: youtube)
+    monkeypatch.setattr(assistant, 'YouTubeTranscriptApi', fakes.RecordedTranscripts(recording))
+    monkeypatch.setattr(assistant, 'watch_page_cache', assistant.PageCache(str(tmp_path / 'pages'), 10 ** 8))
+    monkeypatch.setattr(assistant, 'CRAWL_STATE_DIR', str(tmp_path / 'crawl_state'))
+    monkeypatch.setattr(assistant, 'CHECKPOINT_DIR', str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(assistant, 'CRAWL_PAGE_DELAY', 0)
+    monkeypatch.setattr(assistant, 'CRAWL_KNOWN_RUN', 4)
+    monkeypatch.setattr(assistant, 'refresh_search_index', lambda: None)
+    return table, youtube
+
+def seen_ids(assistant, action):
+    directory = os.path.join(assistant.CRAWL_STATE_DIR, action)
+    [name] = os.listdir(directory)
+    with open(os.path.join(directory, name), encoding='utf-8') as f:
+        return set(json.load(f)['video_ids'])
+
+def test_videos_outside_the_source_dates_are_marked_seen(assistant, stubbed):
+    table, youtube = stubbed
+    # The synthetic talks were uploaded in December 2024
+    source = {'channel': assistant.CHANNEL_PATH, 'title_pattern': "AWS re:Invent 2024",
+              'published_before': '2024-06-30', 'event_name': "re:Invent", 'event_year': "2024"}
+    assistant.crawl_sources([source], action='dated')
+    assert table.items == {}
+    assert len(seen_ids(assistant, 'dated')) == 14  # 12 talks rejected for their date and 2 other videos
+
+    # So the next crawl stops at its first page instead of paging the channel again
+    continuations = youtube.stats['post']
+    assistant.crawl_sources([source], action='dated')
+    assert youtube.stats['post'] == continuations
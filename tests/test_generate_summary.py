@@ -0,0 +1,26 @@
+import fakes
+import pytest
+
+@pytest.fixture
+def stubbed(assistant, monkeypatch, tmp_path):
+    table = fakes.FakeTable(indexes={
+        assistant.EVENT_YEAR_INDEX: ('event_year', ('upload_date', 'view_count')),
+        assistant.NEEDS_SUMMARY_INDEX: ('needs_summary', 'KEYS_ONLY')
+    })
+    monkeypatch.setattr(assistant, 'table', table)
+    monkeypatch.setattr(assistant.write_buffer, 'table', table)
+    monkeypatch.setattr(assistant, 'CHECKPOINT_DIR', str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(assistant, 'refresh_search_index', lambda: None)
+    return table
+
+def test_summarized_videos_leave_the_needs_summary_index(assistant, stubbed, monkeypatch):
+    # A re-ingested video that already has a summary is back in the sparse index
+    stubbed.items['https://www.youtube.com/watch?v=a'] = {
+        'video_url': 'https://www.youtube.com/watch?v=a', 'event_year': '2024', 'needs_summary': '2024',
+        'customer_names': ['Acme'], 'transcript': 'text'
+    }
+    monkeypatch.setattr(assistant, 'summarize_transcript', lambda *args, **kwargs: pytest.fail("summarized again"))
+
+    assistant.generate_summary()
+    assert 'needs_summary' not in stubbed.items['https://www.youtube.com/watch?v=a']
+    assert stubbed.items['https://www.youtube.com/watch?v=a']['customer_names'] == ['Acme']
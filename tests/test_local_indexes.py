@@ -0,0 +1,43 @@
+import fakes
+import pytest
+
+TALKS = {
+    'https://www.youtube.com/watch?v=a': ("Lambda at scale", '0:05 - "Cold starts and provisioned concurrency for Lambda"'),
+    'https://www.youtube.com/watch?v=b': ("DynamoDB deep dive", '0:07 - "Single table design with DynamoDB"'),
+}
+
+@pytest.fixture
+def stubbed(assistant, monkeypatch, tmp_path):
+    table = fakes.FakeTable()
+    for video_url, (title, transcript) in TALKS.items():
+        table.items[video_url] = {
+            'video_url': video_url, 'title': title, 'transcript': transcript, 'has_transcript': True,
+            'updated_date': '2024-12-10'
+        }
+    monkeypatch.setattr(assistant, 'table', table)
+    monkeypatch.setattr(assistant, 'SEARCH_INDEX_PATH', str(tmp_path / 'search' / 'index.pkl'))
+    monkeypatch.setattr(assistant, 'SEMANTIC_INDEX_DIR', str(tmp_path / 'semantic'))
+    monkeypatch.setattr(assistant, 'EMBEDDING_BACKEND', 'local')
+    return table
+
+@pytest.mark.parametrize('kind', ['search', 'semantic'])
+def test_indexes_follow_changed_and_deleted_videos(assistant, stubbed, kind):
+    update, search = {
+        'search': (assistant.update_search_index, assistant.search_videos),
+        'semantic': (assistant.update_semantic_index, assistant.semantic_search)
+    }[kind]
+    update()
+    assert search("single table design DynamoDB", k=1)[0]['video_url'] == 'https://www.youtube.com/watch?v=b'
+
+    # Unchanged videos are not read again
+    get_items = stubbed.stats['get_item']
+    update()
+    assert stubbed.stats['get_item'] == get_items
+
+    stubbed.items['https://www.youtube.com/watch?v=a']['title'] = "Serverless at scale"
+    stubbed.items['https://www.youtube.com/watch?v=a']['updated_date'] = '2024-12-11'
+    del stubbed.items['https://www.youtube.com/watch?v=b']
+    update()
+    assert stubbed.stats['get_item'] == get_items + 1
+    assert 'https://www.youtube.com/watch?v=b' not in {hit['video_url'] for hit in search("single table design DynamoDB", k=5)}
+    assert search("cold starts", k=1)[0]['title'] == "Serverless at scale"
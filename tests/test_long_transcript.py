@@ -0,0 +1,48 @@
+from bedrock_governor import estimate_tokens
+from long_transcript import merge_insights, split_transcript
+
+def test_split_keeps_whole_lines_and_the_header_in_every_chunk():
+    lines = [f'{n // 60}:{n % 60:02d} - "{"word " * 20}"' for n in range(0, 600, 5)]
+    transcript = "start - text\n" + "\n".join(lines)
+    chunks = split_transcript(transcript, 300)
+
+    assert len(chunks) > 1
+    assert all(chunk.startswith("start - text\n") for chunk in chunks)
+    assert [line for chunk in chunks for line in chunk.split("\n")[1:]] == lines
+    assert all(sum(estimate_tokens(line) + 1 for line in chunk.split("\n")[1:]) <= 300 for chunk in chunks)
+
+def test_short_transcript_is_one_chunk():
+    assert split_transcript('start - text\n0:00 - "hello"', 1000) == ['start - text\n0:00 - "hello"']
+
+def test_merge_deduplicates_lists_and_keeps_chunk_order():
+    merged = merge_insights([
+        {
+            'summary': "first half", 'customer_names': ["Acme", "Not Available"], 'industries': ["Retail"],
+            'presenter_details': [{'name': "Jane Doe", 'title': "SA"}],
+            'aws_services': [{'service_name': "Amazon S3", 'time_stamp': "01:00"}],
+            'key_points': [{'point': "one"}], 'level': "300"
+        },
+        None,  # A chunk the model gave nothing for
+        {
+            'summary': "Not Available", 'customer_names': ["acme ", "Globex"], 'industries': "Not Available",
+            'presenter_details': [{'name': "jane doe", 'title': "Principal SA"}, {'name': "Not Available"}],
+            'aws_services': [{'service_name': "amazon s3", 'time_stamp': "20:00"}, {'service_name': "AWS Lambda"}],
+            'key_points': [{'point': "two"}], 'level': "400"
+        }
+    ])
+
+    assert merged['customer_names'] == ["Acme", "Globex"]
+    assert merged['industries'] == ["Retail"]
+    assert merged['use_cases'] == ["Not Available"]
+    assert merged['presenter_details'] == [{'name': "Jane Doe", 'title': "SA"}]
+    assert merged['aws_services'] == [{'service_name': "Amazon S3", 'time_stamp': "01:00"}, {'service_name': "AWS Lambda"}]
+    assert merged['key_points'] == [{'point': "one"}, {'point': "two"}]
+    assert merged['summary'] == ["first half"]  # Left for the reduce step
+    assert merged['level'] == "300"
+
+def test_merge_of_empty_results_marks_everything_not_available():
+    merged = merge_insights([{'summary': "Not Available"}])
+    assert merged['customer_names'] == ["Not Available"]
+    assert merged['presenter_details'] == [{'name': "Not Available", 'title': "Not Available"}]
+    assert merged['key_points'] == ["Not Available"]
+    assert merged['summary'] == []
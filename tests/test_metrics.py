@@ -0,0 +1,76 @@
+import os
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from metrics import Metrics
+
+def test_timers_counters_and_percentiles():
+    metrics = Metrics(sample_size=1000)
+    for n in range(1, 101):
+        metrics.observe('fetch', n / 1000, host='youtube')
+    metrics.increment('retries', component='crawl')
+    metrics.increment('retries', 2, component='crawl')
+    metrics.increment('retries', 0, component='bedrock')  # Zero amounts are not recorded
+
+    report = metrics.summary()
+    entry = report['timers'][('fetch', (('host', 'youtube'),))]
+    assert (entry['count'], entry['max'], entry['p50'], entry['p99']) == (100, 0.1, 0.051, 0.1)
+    assert entry['sum'] == pytest.approx(5.05)
+    assert report['counters'] == {('retries', (('component', 'crawl'),)): 3}
+
+def test_reservoir_keeps_memory_bounded():
+    metrics = Metrics(sample_size=50)
+    for n in range(10000):
+        metrics.observe('request', n)
+    timer = metrics.timers[('request', ())]
+    assert (timer['count'], timer['max'], len(timer['samples'])) == (10000, 9999, 50)
+
+def test_timer_counts_errors():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.timer('stage', stage='store'):
+            raise ValueError
+    with metrics.timer('stage', stage='store'):
+        pass
+    report = metrics.summary()
+    assert report['timers'][('stage', (('stage', 'store'),))]['count'] == 2
+    assert report['counters'] == {('stage_errors', (('stage', 'store'),)): 1}
+
+def test_boto3_hooks_time_calls_and_count_capacity_and_throttles():
+    metrics = Metrics()
+    client = boto3.client('dynamodb', region_name='us-west-2', aws_access_key_id='test', aws_secret_access_key='test')
+    metrics.instrument_boto3(client, 'dynamodb')
+
+    with Stubber(client) as stubber:
+        stubber.add_response(
+            'get_item',
+            {'Item': {'video_url': {'S': 'v'}}, 'ConsumedCapacity': {'TableName': 'videos', 'CapacityUnits': 0.5}},
+            {'TableName': 'videos', 'Key': {'video_url': {'S': 'v'}}, 'ReturnConsumedCapacity': 'TOTAL'}
+        )
+        stubber.add_client_error('get_item', 'ProvisionedThroughputExceededException', http_status_code=400)
+        client.get_item(TableName='videos', Key={'video_url': {'S': 'v'}})
+        with pytest.raises(client.exceptions.ProvisionedThroughputExceededException):
+            client.get_item(TableName='videos', Key={'video_url': {'S': 'v'}})
+
+    report = metrics.summary()
+    assert report['timers'][('aws_request', (('operation', 'GetItem'), ('service', 'dynamodb')))]['count'] == 2
+    assert report['counters'][('dynamodb_consumed_capacity', (('operation', 'GetItem'), ('table', 'videos')))] == 0.5
+    assert report['counters'][('throttles', (('operation', 'GetItem'), ('service', 'dynamodb')))] == 1
+    assert report['counters'][('aws_request_errors', (('operation', 'GetItem'), ('service', 'dynamodb')))] == 1
+
+def test_report_files(tmp_path):
+    metrics = Metrics()
+    metrics.observe('pipeline_stage', 0.25, stage='transcript')
+    metrics.increment('bedrock_cache_hits', 4)
+    text = metrics.write_report(str(tmp_path), 'get_playlist_details')
+
+    assert "pipeline_stage{stage=\"transcript\"}" in text
+    [report] = [name for name in os.listdir(tmp_path) if name.endswith('.txt')]
+    assert report.startswith('get_playlist_details-')
+    with open(tmp_path / 'get_playlist_details.prom', encoding='utf-8') as f:
+        prometheus = f.read()
+    assert '# TYPE youtube_ai_pipeline_stage_seconds summary' in prometheus
+    assert 'youtube_ai_pipeline_stage_seconds_count{action="get_playlist_details",stage="transcript"} 1' in prometheus
+    assert 'youtube_ai_bedrock_cache_hits_total{action="get_playlist_details"} 4' in prometheus
@@ -0,0 +1,62 @@
+import pytest
+
+from page_cache import PageCache
+
+class Response:
+    def __init__(self, status, content=b"", headers=None):
+        self.status = status
+        self.content = content
+        self.headers = headers or {}
+
+class StubClient:
+    """Serves the given responses in order and records the request headers."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append(headers or {})
+        return self.responses.pop(0)
+
+def test_fresh_entry_is_served_from_disk(tmp_path):
+    cache = PageCache(str(tmp_path), 10 ** 6)
+    client = StubClient(Response(200, b"page", {'etag': '"1"'}))
+    assert cache.fetch(client, 'https://example.com/a', max_age=0) == b"page"
+    assert cache.fetch(client, 'https://example.com/a', max_age=3600) == b"page"
+    assert len(client.requests) == 1
+    assert cache.report()['fresh_hits'] == 1
+
+def test_stale_entry_is_revalidated(tmp_path):
+    cache = PageCache(str(tmp_path), 10 ** 6)
+    client = StubClient(Response(200, b"page", {'etag': '"1"'}), Response(304))
+    cache.fetch(client, 'https://example.com/a', max_age=0)
+    assert cache.fetch(client, 'https://example.com/a', max_age=0) == b"page"
+    assert client.requests[1] == {'If-None-Match': '"1"'}
+    assert cache.report()['revalidated'] == 1
+
+@pytest.mark.parametrize('status', [302, 404, 429, 500])
+def test_error_status_raises_and_is_not_cached(tmp_path, status):
+    cache = PageCache(str(tmp_path), 10 ** 6)
+    client = StubClient(Response(status, b"consent page"), Response(200, b"page"))
+    with pytest.raises(Exception, match=f"HTTP {status}"):
+        cache.fetch(client, 'https://example.com/a', max_age=3600)
+    assert cache.report()['entries'] == 0
+    assert cache.fetch(client, 'https://example.com/a', max_age=3600) == b"page"
+
+def test_error_status_keeps_the_cached_page(tmp_path):
+    cache = PageCache(str(tmp_path), 10 ** 6)
+    client = StubClient(Response(200, b"page", {'etag': '"1"'}), Response(503), Response(304))
+    cache.fetch(client, 'https://example.com/a', max_age=0)
+    with pytest.raises(Exception):
+        cache.fetch(client, 'https://example.com/a', max_age=0)
+    assert cache.fetch(client, 'https://example.com/a', max_age=0) == b"page"
+
+def test_entries_are_evicted_least_recently_used(tmp_path):
+    cache = PageCache(str(tmp_path), max_bytes=60)
+    client = StubClient(*[Response(200, b"x" * 30) for _ in range(3)])
+    for name in ('a', 'b', 'c'):
+        cache.fetch(client, f"https://example.com/{name}", max_age=0)
+    assert cache.report()['evictions'] >= 1
+    assert cache.report()['bytes'] <= 60
+    assert PageCache(str(tmp_path), max_bytes=60).report()['entries'] == cache.report()['entries']
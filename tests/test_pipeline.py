@@ -0,0 +1,34 @@
+import threading
+import time
+
+from pipeline import map_bounded
+
+def test_map_bounded_keeps_order_and_limits_pending_items():
+    started = []
+    lock = threading.Lock()
+
+    def work(n):
+        with lock:
+            started.append(n)
+        time.sleep(0.001 * (n % 3))
+        return n * n
+
+    results = []
+    for n, result in enumerate(map_bounded(work, range(50), workers=4, window=6)):
+        with lock:
+            assert len(started) <= n + 6  # Never more than the window submitted ahead of the consumer
+        results.append(result)
+    assert results == [n * n for n in range(50)]
+
+def test_map_bounded_consumes_items_lazily():
+    consumed = []
+
+    def items():
+        for n in range(100):
+            consumed.append(n)
+            yield n
+
+    results = map_bounded(lambda n: n, items(), workers=2, window=4)
+    assert next(results) == 0
+    assert len(consumed) <= 5
+    assert list(results) == list(range(1, 100))
@@ -0,0 +1,68 @@
+import gzip
+import json
+
+import fakes
+from s3_export import IncrementalS3Exporter
+
+def make_exporter(s3, **kwargs):
+    return IncrementalS3Exporter(s3, 'bucket', 'summaries/', 'summaries/_manifest.json.gz', workers=2, **kwargs)
+
+def test_unchanged_objects_are_skipped_on_the_next_export():
+    s3 = fakes.FakeS3()
+    exporter = make_exporter(s3)
+    assert exporter.export('a.txt', "first")
+    assert exporter.export('b.txt', "second")
+    assert exporter.close() == {'unchanged': 0, 'uploaded': 2, 'failed': 0, 'bytes_uploaded': 11}
+    assert s3.objects[('bucket', 'summaries/a.txt')] == b"first"
+
+    exporter = make_exporter(s3)
+    assert not exporter.export('a.txt', "first")
+    assert exporter.export('b.txt', "second, edited")
+    assert exporter.close()['uploaded'] == 1
+    assert exporter.stats['unchanged'] == 1
+    assert s3.objects[('bucket', 'summaries/b.txt')] == b"second, edited"
+
+def test_versions_let_callers_skip_building_the_content():
+    s3 = fakes.FakeS3()
+    exporter = make_exporter(s3)
+    exporter.export('a.txt', "content", version='fingerprint-1')
+    exporter.close()
+
+    exporter = make_exporter(s3)
+    assert exporter.is_current('a.txt', 'fingerprint-1')
+    assert not exporter.is_current('a.txt', 'fingerprint-2')
+    assert not exporter.is_current('b.txt', 'fingerprint-1')
+    assert exporter.close()['unchanged'] == 1
+
+def test_failed_uploads_stay_out_of_the_manifest(monkeypatch):
+    s3 = fakes.FakeS3()
+    exporter = make_exporter(s3)
+
+    def upload_fileobj(Fileobj, Bucket, Key, ExtraArgs=None, Config=None):
+        if Key.endswith('bad.txt'):
+            raise Exception("SlowDown")
+        s3.objects[(Bucket, Key)] = Fileobj.read()
+
+    monkeypatch.setattr(s3, 'upload_fileobj', upload_fileobj)
+    exporter.export('good.txt', "good")
+    exporter.export('bad.txt', "bad")
+    assert exporter.close()['failed'] == 1
+
+    manifest = json.loads(gzip.decompress(s3.objects[('bucket', 'summaries/_manifest.json.gz')]))
+    assert set(manifest) == {'good.txt'}
+
+def test_gzip_objects(monkeypatch):
+    s3 = fakes.FakeS3()
+    uploads = []
+    upload_fileobj = s3.upload_fileobj
+
+    def recording_upload(Fileobj, Bucket, Key, ExtraArgs=None, Config=None):
+        uploads.append(ExtraArgs)
+        upload_fileobj(Fileobj, Bucket, Key, ExtraArgs, Config)
+
+    monkeypatch.setattr(s3, 'upload_fileobj', recording_upload)
+    exporter = make_exporter(s3, gzip_objects=True)
+    exporter.export('a.txt', "compressed " * 100)
+    exporter.close()
+    assert gzip.decompress(s3.objects[('bucket', 'summaries/a.txt')]) == ("compressed " * 100).encode('utf-8')
+    assert uploads == [{'ContentType': 'text/plain', 'ContentEncoding': 'gzip'}]
@@ -0,0 +1,100 @@
+from search_index import SearchIndex, transcript_entries, transcript_passages
+from transcript_model import Transcript
+
+def rendered(*entries):
+    transcript = Transcript.from_entries([{'start': start, 'duration': 2.0, 'text': text} for start, text in entries])
+    return transcript.render()
+
+def test_multi_line_captions_are_kept():
+    transcript, _, _ = rendered(
+        (4.2, "today we talk about Lambda"),
+        (7.0, 'and "SnapStart"\nfor Java'),
+        (65.5, "cold starts\ndrop a lot.")
+    )
+    assert list(transcript_entries(transcript)) == [
+        (4, "today we talk about Lambda"),
+        (7, 'and "SnapStart" for Java'),
+        (65, "cold starts drop a lot.")
+    ]
+    assert transcript_passages(transcript, passage_words=3) == [
+        (4, "today we talk about Lambda"),
+        (7, 'and "SnapStart" for Java'),
+        (65, "cold starts drop a lot.")
+    ]
+
+def test_passages_group_entries_by_word_count():
+    transcript, _, _ = rendered((0, "one two"), (3, "three four"), (6, "five six"), (9, "seven"))
+    assert transcript_passages(transcript, passage_words=4) == [(0, "one two three four"), (6, "five six seven")]
+
+def test_transcripts_without_entries_fall_back_to_sentences():
+    assert transcript_passages("", "First sentence here.\nSecond one.", passage_words=2) == [
+        (0, "First sentence here."), (0, "Second one.")
+    ]
+
+def test_removed_passages_do_not_count_in_document_frequencies():
+    index = SearchIndex()
+    index.add_video('a', "Lambda", [('transcript', 0, "cold starts"), ('transcript', 30, "cold starts again")])
+    index.add_video('b', "DynamoDB", [('transcript', 0, "cold data in S3")])
+    index.add_video('a', "Lambda", [('transcript', 0, "SnapStart")])
+    # The replaced passages still list "cold" until compaction; counting them gave it a negative weight
+    [hit] = index.search("cold")
+    assert hit['video_url'] == 'b' and hit['score'] > 0
+    index.compact()
+    assert index.search("cold")[0]['score'] == hit['score']
+
+def build_index():
+    index = SearchIndex()
+    index.add_video('a', "Lambda at scale", [
+        ('transcript', 5, "cold starts hurt latency for Lambda functions"),
+        ('transcript', 70, "provisioned concurrency removes cold starts"),
+        ('summary', 0, "How to tune Lambda")
+    ], fingerprint='fa')
+    index.add_video('b', "DynamoDB deep dive", [
+        ('transcript', 12, "single table design keeps the access patterns together"),
+        ('transcript', 95, "starts with the access patterns, and cold data moves to S3")
+    ], fingerprint='fb')
+    index.add_video('c', "Storage", [('aws_service', 30, "Amazon S3 storage classes")], fingerprint='fc')
+    return index
+
+def test_bm25_ranks_denser_matches_first():
+    hits = build_index().search("cold starts")
+    assert [(hit['video_url'], hit['seconds']) for hit in hits[:2]] == [('a', 70), ('a', 5)]
+    assert hits[0]['timestamp'] == "01:10"
+    assert hits[0]['title'] == "Lambda at scale"
+    assert {hit['video_url'] for hit in hits} == {'a', 'b'}
+    assert hits == sorted(hits, key=lambda hit: -hit['score'])
+
+def test_phrases_must_match_in_order():
+    index = build_index()
+    assert [hit['seconds'] for hit in index.search('"cold starts"')] == [70, 5]
+    assert [hit['seconds'] for hit in index.search('"starts cold"')] == []
+    assert [(hit['video_url'], hit['seconds']) for hit in index.search('"the access patterns" single')] == [('b', 12), ('b', 95)]
+    # Stopwords count inside phrases
+    assert [hit['seconds'] for hit in index.search('"keeps the access"')] == [12]
+
+def test_per_video_caps_the_hits_of_one_video():
+    hits = build_index().search("cold starts", per_video=1)
+    assert [hit['video_url'] for hit in hits] == ['a', 'b']
+
+def test_replaced_and_removed_videos_leave_the_results():
+    index = build_index()
+    index.add_video('a', "Lambda at scale", [('transcript', 5, "SnapStart for Java")], fingerprint='fa2')
+    index.remove_video('c')
+    assert [hit['video_url'] for hit in index.search("cold starts")] == ['b']
+    assert index.search("storage classes") == []
+    assert (index.fingerprint('a'), index.fingerprint('c'), len(index)) == ('fa2', None, 2)
+
+def test_compact_keeps_results_and_phrases(tmp_path):
+    index = build_index()
+    index.add_video('a', "Lambda at scale", [('transcript', 5, "provisioned concurrency removes cold starts")], fingerprint='fa2')
+    index.remove_video('c')
+    queries = ["cold starts", '"cold starts"', '"the access patterns"', "provisioned", "storage"]
+    before = [index.search(query) for query in queries]
+    assert index.dead_ratio() > 0
+
+    index.compact()
+    assert index.dead_ratio() == 0
+    assert [index.search(query) for query in queries] == before
+
+    index.save(str(tmp_path / 'index.pkl'))
+    assert [SearchIndex.load(str(tmp_path / 'index.pkl')).search(query) for query in queries] == before
@@ -0,0 +1,101 @@
+import os
+
+import numpy as np
+
+from semantic_index import HashingEmbedder, VectorIndex
+
+def build(directory, videos):
+    embedder = HashingEmbedder(64)
+    index = VectorIndex(str(directory), embedder.dimensions, embedder.name)
+    for video_url, texts in videos.items():
+        chunks = [(n * 30, text) for n, text in enumerate(texts)]
+        index.add_video(video_url, video_url.upper(), chunks, embedder.embed(texts), fingerprint=video_url)
+    return index, embedder
+
+def test_compaction_commits_only_when_the_metadata_is_saved(tmp_path):
+    index, embedder = build(tmp_path, {
+        'a': ["lambda cold starts", "provisioned concurrency"],
+        'b': ["dynamodb single table design"],
+        'c': ["s3 storage classes"]
+    })
+    index.save()
+    index.remove_video('b')
+    index.compact()
+
+    # Until save() the saved index still reads its own matrix, which compaction left alone
+    assert os.path.exists(tmp_path / 'vectors.f32')
+    before_save = VectorIndex(str(tmp_path), embedder.dimensions, embedder.name)
+    assert before_save.fingerprint('b') == 'b'
+    assert before_save.search(embedder.embed(["dynamodb single table design"])[0], k=1)[0]['video_url'] == 'b'
+
+    index.save()
+    assert sorted(os.listdir(tmp_path)) == ['index.pkl', 'vectors-1.f32']
+    reopened = VectorIndex(str(tmp_path), embedder.dimensions, embedder.name)
+    assert reopened.fingerprint('b') is None
+    hit = reopened.search(embedder.embed(["s3 storage classes"])[0], k=1)[0]
+    assert (hit['video_url'], hit['text']) == ('c', "s3 storage classes")
+    assert np.allclose(reopened.video_vector('a'), index.video_vector('a'))
+
+def random_index(directory, videos=40, chunks=30, dimensions=16, seed=1):
+    rng = np.random.default_rng(seed)
+    index = VectorIndex(str(directory), dimensions, 'random')
+    for n in range(videos):
+        vectors = rng.normal(size=(chunks, dimensions)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index.add_video(f"v{n}", f"Talk {n}", [(seconds * 10, f"chunk {seconds}") for seconds in range(chunks)], vectors)
+    return index, rng
+
+def brute_force(index, query, k):
+    rows = [row for video in index.videos.values() for row in video['rows']]
+    scores = np.asarray(index.vectors[rows]) @ query
+    return [(index.meta['row_video'][rows[i]], index.meta['row_seconds'][rows[i]]) for i in np.argsort(-scores)[:k]]
+
+def ranked(hits):
+    # Scores of one query alone and in a batch may differ in the last float bits
+    return [(hit['video_url'], hit['seconds'], round(hit['score'], 4)) for hit in hits]
+
+def test_exact_search_matches_brute_force_for_one_or_many_queries(tmp_path):
+    index, rng = random_index(tmp_path)  # 1200 rows, past the initial capacity
+    queries = rng.normal(size=(3, 16)).astype(np.float32)
+    index.BLOCK_ROWS = 256  # Several blocks
+
+    batched = index.search(queries, k=5)
+    for query, hits in zip(queries, batched):
+        assert [(hit['video_url'], hit['seconds']) for hit in hits] == brute_force(index, query, 5)
+        assert ranked(index.search(query, k=5)) == ranked(hits)
+    assert batched[0][0]['title'] == f"Talk {batched[0][0]['video_url'][1:]}"
+
+def test_per_video_and_similar_videos(tmp_path):
+    index, rng = random_index(tmp_path)
+    hits = index.search(rng.normal(size=16).astype(np.float32), k=8, per_video=1)
+    assert len({hit['video_url'] for hit in hits}) == len(hits) == 8
+
+    similar = index.similar_videos('v3', k=5)
+    assert len(similar) == 5 and 'v3' not in {hit['video_url'] for hit in similar}
+    assert index.similar_videos('unknown') == []
+
+def test_ann_with_every_cell_probed_is_exact(tmp_path):
+    index, rng = random_index(tmp_path)
+    index.build_ann(cells=8)
+    assert not index.ann_is_stale(100)
+    query = rng.normal(size=16).astype(np.float32)
+    exact = index.search(query, k=10)
+    assert ranked(index.search(query, k=10, probes=8)) == ranked(exact)
+    assert len(index.search(query, k=10, probes=2)) == 10
+
+    # Rows added after training join their nearest cell
+    index.add_video('new', "New talk", [(0, "chunk")], query[None, :] / np.linalg.norm(query))
+    assert index.search(query, k=1, probes=1)[0]['video_url'] == 'new'
+
+def test_compact_keeps_search_results(tmp_path):
+    index, rng = random_index(tmp_path)
+    index.build_ann(cells=8)
+    for n in range(0, 40, 2):
+        index.remove_video(f"v{n}")
+    queries = rng.normal(size=(4, 16)).astype(np.float32)
+    before = [ranked(hits) for hits in index.search(queries, k=10) + index.search(queries, k=10, probes=8)]
+    assert index.dead_ratio() == 0.5
+
+    index.compact()
+    assert index.dead_ratio() == 0 and index.meta['rows'] == 600
+    assert [ranked(hits) for hits in index.search(queries, k=10) + index.search(queries, k=10, probes=8)] == before
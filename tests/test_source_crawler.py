@@ -0,0 +1,99 @@
+import json
+import os
+
+import pytest
+
+import fakes
+import source_crawler
+from checkpoint import Checkpoint
+from source_crawler import SourceCrawler
+
+CHANNEL_PATH = "/@AWSEventsChannel/videos"
+SOURCE = {'channel': CHANNEL_PATH, 'title_pattern': r"AWS re:Invent 2024", 'event_name': "re:Invent"}
+
+@pytest.fixture(scope='module')
+def recording(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp('recording'))
+    fakes.write_synthetic_recording(directory, 40, per_page=10, transcript_minutes=10)
+    return directory
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    monkeypatch.setattr(source_crawler.time, 'sleep', lambda seconds: None)
+
+def make_crawler(recording, state_directory, checkpoint=None, known_run=None):
+    youtube = fakes.RecordedYouTube(recording, CHANNEL_PATH)
+    return SourceCrawler(
+        [SOURCE], lambda host: youtube, page_delay=0, state_directory=state_directory,
+        known_run=known_run, checkpoint=checkpoint
+    )
+
+def video_id(video):
+    return video['url'].split("v=")[1]
+
+def saved_seen(state_directory):
+    [name] = os.listdir(state_directory)
+    with open(os.path.join(state_directory, name), encoding='utf-8') as f:
+        return set(json.load(f)['video_ids'])
+
+def test_only_handled_videos_are_marked_seen(recording, tmp_path):
+    state_directory = str(tmp_path / 'state')
+    crawler = make_crawler(recording, state_directory)
+    videos = [video for batch in crawler.batches() for video in batch]
+    assert len(videos) == 40
+    failed = {video_id(video) for video in videos[::7]}
+    for video in videos:
+        if video_id(video) not in failed:
+            crawler.video_done(video)
+    assert crawler.finished()
+    crawler.save_seen()
+
+    seen = saved_seen(state_directory)
+    assert not failed & seen
+    assert {video_id(video) for video in videos} - failed <= seen
+    assert len(seen) == 49 - len(failed)  # 40 talks and 9 other videos are listed; non-talks count as handled
+
+    # The next incremental crawl yields the failed videos again
+    again = [video for batch in make_crawler(recording, state_directory, known_run=5).batches() for video in batch]
+    assert {video_id(video) for video in again} >= failed
+
+def test_nothing_is_marked_seen_before_save(recording, tmp_path):
+    state_directory = str(tmp_path / 'state')
+    crawler = make_crawler(recording, state_directory)
+    for batch in crawler.batches():
+        for video in batch:
+            crawler.video_done(video)
+    assert not os.path.exists(state_directory) or os.listdir(state_directory) == []
+
+def test_interrupted_crawl_yields_unhandled_videos_first(recording, tmp_path):
+    state_directory = str(tmp_path / 'state')
+    path = str(tmp_path / 'crawl.json')
+    checkpoint = Checkpoint(path, interval=3600)
+    crawler = make_crawler(recording, state_directory, checkpoint=checkpoint)
+    batches = crawler.batches()
+    first = next(batches)
+    crawler.video_done(first[0])
+    batches.close()  # Interrupted after the first page
+    checkpoint.save()
+
+    resumed = make_crawler(recording, state_directory, checkpoint=Checkpoint(path))
+    batches = list(resumed.batches())
+    # The crawl may have read ahead before it stopped: those videos are pending too
+    assert {video['url'] for video in first[1:]} <= {video['url'] for video in batches[0]}
+    urls = [video['url'] for batch in batches for video in batch]
+    assert first[0]['url'] not in urls
+    assert sorted(urls) == sorted(set(urls))
+    assert len(urls) == 39
+    assert resumed.report()['pages'] < 5  # Resumed past the pages already read
+
+def test_playlists_are_read_past_max_pages(tmp_path):
+    directory = str(tmp_path / 'recording')
+    fakes.write_synthetic_recording(directory, 40, per_page=5, transcript_minutes=10, playlist_id='PLtalks')
+    youtube = fakes.RecordedYouTube(directory, CHANNEL_PATH)
+
+    def crawl(source):
+        crawler = SourceCrawler([dict(source, title_pattern=SOURCE['title_pattern'])], lambda host: youtube, page_delay=0, max_pages=3)
+        return [video for batch in crawler.batches() for video in batch]
+
+    assert len(crawl({'playlist': 'PLtalks'})) == 40
+    assert len(crawl({'channel': CHANNEL_PATH})) == 12  # 3 pages of 5 videos, 4 of them talks
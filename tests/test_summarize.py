@@ -0,0 +1,60 @@
+import pytest
+
+def chunk_result(chunk):
+    return {
+        'summary': f"summary of {chunk}", 'key_points': [f"point of {chunk}"], 'customer_names': [],
+        'industries': [], 'use_cases': [], 'problem_statements': [], 'solutions': [], 'aws_services': [],
+        'presenter_details': []
+    }
+
+@pytest.fixture
+def chunked(assistant, monkeypatch):
+    """Split transcripts on '|' and answer prompts from `answers` (chunk -> result or None)."""
+    answers = {}
+    prompts = []
+    usages = []
+
+    def invoke(prompt, estimated_input_tokens=None, usage=None):
+        prompts.append(prompt)
+        if usage is not None:
+            usages.append(usage)
+            usage['requests'] = usage.get('requests', 0) + 1
+        if "Part 1: " in prompt:
+            return {'summary': "reduced summary"}
+        for chunk, result in answers.items():
+            if chunk in prompt:
+                return result
+        raise AssertionError(f"unexpected prompt: {prompt[-100:]}")
+
+    monkeypatch.setattr(assistant, 'split_transcript', lambda transcript, chunk_tokens: transcript.split('|'))
+    monkeypatch.setattr(assistant, 'invoke_bedrock_model', invoke)
+    return answers, prompts, usages
+
+def test_failed_chunk_fails_the_whole_summary(assistant, chunked):
+    answers, prompts, _ = chunked
+    answers.update({'chunk-a': chunk_result('chunk-a'), 'chunk-b': None, 'chunk-c': chunk_result('chunk-c')})
+    assert assistant.summarize_transcript("chunk-a|chunk-b|chunk-c") is None
+    assert len(prompts) == 3  # No reduce step over the partial summaries
+
+def test_chunk_summaries_are_merged_and_reduced(assistant, chunked):
+    answers, prompts, _ = chunked
+    answers.update({'chunk-a': chunk_result('chunk-a'), 'chunk-b': chunk_result('chunk-b')})
+    result = assistant.summarize_transcript("chunk-a|chunk-b")
+    assert result['summary'] == "reduced summary"
+    assert result['key_points'] == ["point of chunk-a", "point of chunk-b"]
+    assert len(prompts) == 3
+
+def test_single_chunk_failure_returns_none(assistant, chunked):
+    answers, _, _ = chunked
+    answers['whole talk'] = None
+    assert assistant.summarize_transcript("whole talk") is None
+
+def test_concurrent_chunks_count_usage_in_their_own_dicts(assistant, chunked):
+    answers, _, usages = chunked
+    answers.update({'chunk-a': chunk_result('chunk-a'), 'chunk-b': chunk_result('chunk-b'), 'chunk-c': chunk_result('chunk-c')})
+    usage = {}
+    assistant.summarize_transcript("chunk-a|chunk-b|chunk-c", usage=usage)
+    # No two chunks shared a dict, and their counts were added to the caller's
+    assert len({id(chunk_usage) for chunk_usage in usages[:3]}) == 3
+    assert all(chunk_usage is not usage for chunk_usage in usages[:3])
+    assert usage['requests'] == 4  # Three chunks and the reduce step
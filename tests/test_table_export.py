@@ -0,0 +1,68 @@
+import decimal
+import gzip
+import json
+
+import fakes
+from table_export import PartitionedJsonlExporter, to_json_value
+
+def export(s3, rows, publish=True, rows_per_file=2):
+    exporter = PartitionedJsonlExporter(s3, 'bucket', 'analytics/', 'event_year', rows_per_file=rows_per_file)
+    for row in rows:
+        exporter.write(row)
+    return exporter.close(publish=publish)
+
+def published_rows(s3):
+    pointer = json.loads(s3.objects[('bucket', 'analytics/LATEST.json')])
+    rows = []
+    for key in pointer['files']:
+        assert key.startswith(pointer['prefix'])
+        rows.extend(json.loads(line) for line in gzip.decompress(s3.objects[('bucket', key)]).decode('utf-8').splitlines())
+    return sorted(row['video_url'] for row in rows)
+
+def rows(name, count, year='2024'):
+    return [{'video_url': f"{name}{n}", 'event_year': year} for n in range(count)]
+
+def test_rows_are_partitioned_and_published():
+    s3 = fakes.FakeS3()
+    stats = export(s3, rows('a', 3) + rows('b', 2, year='2023') + [{'video_url': 'c0'}])
+    assert stats['published'] and stats['rows'] == 6
+    assert published_rows(s3) == ['a0', 'a1', 'a2', 'b0', 'b1', 'c0']
+    partitions = {key.split('/')[2] for key in s3.keys('analytics/run=')}
+    assert partitions == {'event_year=2024', 'event_year=2023', 'event_year=unknown'}
+
+def test_interrupted_export_keeps_the_published_one():
+    s3 = fakes.FakeS3()
+    export(s3, rows('v', 6))
+    before = sorted(s3.keys())
+    stats = export(s3, rows('w', 3), publish=False)
+    assert not stats['published']
+    assert published_rows(s3) == ['v0', 'v1', 'v2', 'v3', 'v4', 'v5']
+    assert sorted(s3.keys()) == before
+
+def test_failed_upload_keeps_the_published_one(monkeypatch):
+    s3 = fakes.FakeS3()
+    export(s3, rows('v', 6))
+
+    def upload_file(*args, **kwargs):
+        raise Exception("connection reset")
+    monkeypatch.setattr(s3, 'upload_file', upload_file)
+    stats = export(s3, rows('w', 3))
+    assert not stats['published'] and stats['failed_files'] == 2
+    assert published_rows(s3) == ['v0', 'v1', 'v2', 'v3', 'v4', 'v5']
+
+def test_complete_export_replaces_the_previous_run():
+    s3 = fakes.FakeS3()
+    export(s3, rows('v', 6))
+    s3.put_object(Bucket='bucket', Key='analytics/event_year=2024/part-00000.jsonl.gz', Body=b"old layout")
+    stats = export(s3, rows('x', 3))
+    assert published_rows(s3) == ['x0', 'x1', 'x2']
+    assert stats['stale_deleted'] == 4
+    assert all(key == 'analytics/LATEST.json' or key.startswith(json.loads(s3.objects[('bucket', 'analytics/LATEST.json')])['prefix'])
+               for key in s3.keys())
+
+def test_to_json_value():
+    item = {
+        'view_count': decimal.Decimal('12'), 'score': decimal.Decimal('0.5'),
+        'aws_services': [{'service_name': 'Lambda'}], 'tags': {'b', 'a'}, 'transcript': b"\x78\x9c"
+    }
+    assert to_json_value(item) == {'view_count': 12, 'score': 0.5, 'aws_services': [{'service_name': 'Lambda'}], 'tags': ['a', 'b']}
@@ -0,0 +1,31 @@
+from types import SimpleNamespace
+
+from transcript_model import Transcript, format_sentence_spans
+
+ENTRIES = [
+    {'start': 0.0, 'duration': 2.5, 'text': "Welcome to re:Invent."},
+    {'start': 2.5, 'duration': 3.0, 'text': "Today we talk about"},
+    {'start': 65.4, 'duration': 2.0, 'text': "Lambda\ncold starts."},
+    {'start': 119.996, 'duration': 1.0, 'text': "Questions"},
+]
+
+def test_render_formats_lines_and_sentences_in_one_pass():
+    transcript_data, sentences, spans = Transcript.from_entries(ENTRIES).render()
+    assert transcript_data == (
+        'start - text\n'
+        '00:00 - "Welcome to re:Invent."\n'
+        '00:02 - "Today we talk about"\n'
+        '01:05 - "Lambda\ncold starts."\n'
+        '01:60 - "Questions"\n'  # A fraction of .995 or more rounds up, as the old formatting did
+    )
+    assert sentences == "Welcome to re:Invent.\nToday we talk about Lambda cold starts.\nQuestions"
+    assert spans == [(0.0, 2.5), (2.5, 67.4), (119.996, 120.996)]
+    assert format_sentence_spans(spans) == "0.0 2.5\n2.5 67.4\n120.0 121.0"
+
+def test_snippet_objects_from_the_fetch_api():
+    snippets = [SimpleNamespace(**entry) for entry in ENTRIES[:2]]
+    assert Transcript.from_entries(snippets).render() == Transcript.from_entries(ENTRIES[:2]).render()
+    assert len(Transcript.from_entries(snippets)) == 2
+
+def test_empty_transcript():
+    assert Transcript.from_entries([]).render() == ("start - text\n", "", [])
@@ -0,0 +1,41 @@
+from boto3.dynamodb.types import Binary
+
+import fakes
+from transcript_storage import STORAGE_S3, STORAGE_ZLIB, decode_transcripts, encode_transcripts
+
+TRANSCRIPT = 'start - text\n00:00 - "Welcome to re:Invent, 2024 ✨."\n'
+SENTENCES = "Welcome to re:Invent, 2024 ✨."
+SPANS = "0.0 2.5"
+
+def store(item, attributes, removed):
+    # What the UpdateItem SET/REMOVE does to the item, with binaries read back as boto3 returns them
+    for name in removed:
+        item.pop(name, None)
+    item.update({name: Binary(value) if isinstance(value, bytes) else value for name, value in attributes.items()})
+    return item
+
+def test_small_transcripts_round_trip_through_compressed_attributes():
+    s3 = fakes.FakeS3()
+    attributes, removed = encode_transcripts('vid', TRANSCRIPT, SENTENCES, s3, 'bucket', 'transcripts/', 10000, SPANS)
+    assert attributes['transcript_storage'] == STORAGE_ZLIB
+    assert removed == ['transcript_s3_key']
+    assert not s3.objects
+
+    item = store({'video_url': 'v', 'transcript_s3_key': 'transcripts/old.json.z'}, attributes, removed)
+    decode_transcripts(item, s3, 'bucket')
+    assert (item['transcript'], item['transcript_sentences'], item['transcript_sentence_spans']) == (TRANSCRIPT, SENTENCES, SPANS)
+
+def test_large_transcripts_round_trip_through_s3():
+    s3 = fakes.FakeS3()
+    attributes, removed = encode_transcripts('vid', TRANSCRIPT, SENTENCES, s3, 'bucket', 'transcripts/', 10, SPANS)
+    assert attributes == {'transcript_storage': STORAGE_S3, 'transcript_s3_key': 'transcripts/vid.json.z'}
+    assert set(removed) == {'transcript', 'transcript_sentences', 'transcript_sentence_spans'}
+    assert ('bucket', 'transcripts/vid.json.z') in s3.objects
+
+    item = store({'video_url': 'v', 'transcript': b"stale"}, attributes, removed)
+    decode_transcripts(item, s3, 'bucket')
+    assert (item['transcript'], item['transcript_sentences'], item['transcript_sentence_spans']) == (TRANSCRIPT, SENTENCES, SPANS)
+
+def test_items_stored_before_compression_are_left_alone():
+    item = {'video_url': 'v', 'transcript': TRANSCRIPT, 'transcript_sentences': SENTENCES}
+    assert decode_transcripts(dict(item), fakes.FakeS3(), 'bucket') == item
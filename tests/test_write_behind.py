@@ -0,0 +1,87 @@
+import threading
+import time
+
+from botocore.exceptions import ClientError, EndpointConnectionError
+
+import write_behind
+from write_behind import WriteBehindBuffer, is_retryable
+
+def client_error(code):
+    return ClientError({'Error': {'Code': code, 'Message': code}}, 'UpdateItem')
+
+class StubTable:
+    """Records update_item calls; `errors` are raised by the first calls, in order."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def update_item(self, **request):
+        with self.lock:
+            self.requests.append(request)
+            if self.errors:
+                raise self.errors.pop(0)
+
+def test_flush_waits_for_success_callbacks():
+    table = StubTable()
+    buffer = WriteBehindBuffer(table, workers=2)
+    finished = []
+
+    def slow_callback(key):
+        def callback():
+            time.sleep(0.05)
+            finished.append(key)
+        return callback
+
+    for key in ('a', 'b', 'c', 'd'):
+        buffer.update(key, {'view_count': 1}, on_success=slow_callback(key))
+
+    assert buffer.flush() == []
+    assert sorted(finished) == ['a', 'b', 'c', 'd']
+
+def test_callbacks_run_after_their_write():
+    table = StubTable()
+    buffer = WriteBehindBuffer(table, workers=1)
+    writes_seen = []
+    buffer.update('a', {'title': 't'}, on_success=lambda: writes_seen.append(len(table.requests)))
+    buffer.flush()
+    assert writes_seen == [1]
+
+def test_pending_updates_to_one_key_are_coalesced():
+    table = StubTable()
+    buffer = WriteBehindBuffer(table, workers=1)
+    with buffer.condition:
+        # Hold the workers off so both updates are still pending
+        buffer.update('a', {'title': 'old', 'view_count': 1})
+        buffer.update('a', {'title': 'new'}, remove=['view_count'])
+    buffer.flush()
+    assert len(table.requests) == 1
+    request = table.requests[0]
+    assert request['UpdateExpression'] == "SET #s0 = :s0 REMOVE #r0"
+    assert request['ExpressionAttributeValues'] == {':s0': 'new'}
+
+def test_validation_error_fails_without_retry():
+    table = StubTable(errors=[client_error('ValidationException')])
+    buffer = WriteBehindBuffer(table, workers=1)
+    called = []
+    buffer.update('a', {'title': 't'}, on_success=lambda: called.append('a'))
+    failures = buffer.flush()
+    assert [key for key, _ in failures] == ['a']
+    assert len(table.requests) == 1
+    assert called == []
+
+def test_throttled_write_is_retried(monkeypatch):
+    monkeypatch.setattr(write_behind.time, 'sleep', lambda seconds: None)
+    table = StubTable(errors=[client_error('ProvisionedThroughputExceededException'), client_error('ThrottlingException')])
+    buffer = WriteBehindBuffer(table, workers=1)
+    buffer.update('a', {'title': 't'})
+    assert buffer.flush() == []
+    assert len(table.requests) == 3
+    assert buffer.stats['retries'] == 2
+
+def test_is_retryable():
+    assert is_retryable(client_error('InternalServerError'))
+    assert is_retryable(EndpointConnectionError(endpoint_url='https://dynamodb'))
+    assert not is_retryable(client_error('ConditionalCheckFailedException'))
+    assert not is_retryable(TypeError("bad value"))
@@ -0,0 +1,90 @@
+import gzip
+import http.client
+import http.server
+import threading
+import time
+
+import pytest
+
+from youtube_http import HTTPConnectionPool
+
+class Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive unless a response says otherwise
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            server.connections.add(self.client_address)
+        time.sleep(server.delay)
+        body = f"page {self.path}".encode('utf-8')
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and self.path == '/gzip':
+            body = gzip.compress(body)
+            self.send_response(200)
+            self.send_header('Content-Encoding', 'gzip')
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # Drop the connection without announcing it, as servers do with idle keep-alives
+        self.close_connection = self.path == '/drop'
+        with server.lock:
+            server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server(monkeypatch):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.lock = threading.Lock()
+    server.active = server.peak = 0
+    server.connections = set()
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # Plain HTTP to the local server in place of TLS
+    monkeypatch.setattr(http.client, 'HTTPSConnection', http.client.HTTPConnection)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def make_pool(server, **kwargs):
+    return HTTPConnectionPool(f"127.0.0.1:{server.server_address[1]}", timeout=5, **kwargs)
+
+def test_sequential_requests_share_one_connection(server):
+    pool = make_pool(server)
+    for n in range(5):
+        response = pool.get(f"/watch?v={n}")
+        assert (response.status, response.text) == (200, f"page /watch?v={n}")
+    assert pool.stats == {'requests': 5, 'connections_opened': 1, 'reconnects': 0}
+    assert len(server.connections) == 1
+    pool.close()
+
+def test_full_urls_and_gzip_bodies(server):
+    pool = make_pool(server)
+    assert pool.get("https://www.youtube.com/gzip").content == b"page /gzip"
+    pool.close()
+
+def test_a_connection_closed_by_the_server_is_replaced_once(server):
+    pool = make_pool(server)
+    pool.get("/drop")
+    time.sleep(0.05)
+    assert pool.get("/next").text == "page /next"
+    assert pool.stats['reconnects'] == 1
+    pool.close()
+
+def test_concurrent_requests_stay_within_max_connections(server):
+    server.delay = 0.05
+    pool = make_pool(server, max_connections=2)
+    threads = [threading.Thread(target=pool.get, args=(f"/watch?v={n}",)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert server.peak <= 2
+    assert pool.stats['connections_opened'] <= 2
+    assert pool.stats['requests'] == 8
+    pool.close()
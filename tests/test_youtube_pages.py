@@ -0,0 +1,45 @@
+import json
+
+from youtube_pages import parse_watch_page
+
+def watch_page(player_response, extra_html=""):
+    return (f'<html><head>{extra_html}</head><body><script>var ytInitialPlayerResponse = '
+            f'{json.dumps(player_response)};var meta = {{}};</script></body></html>')
+
+def test_player_response_gives_every_field():
+    page = watch_page({
+        'videoDetails': {'title': "AWS re:Invent 2024 - Keynote", 'author': "AWS Events", 'lengthSeconds': "3810", 'viewCount': "12345"},
+        'microformat': {'playerMicroformatRenderer': {'publishDate': "2024-12-03T08:00:00-08:00"}}
+    })
+    assert parse_watch_page(page) == {
+        'title': "AWS re:Invent 2024 - Keynote",
+        'channel_name': "AWS Events",
+        'upload_date': "2024-12-03T08:00:00-08:00",
+        'duration': "63M 30S",
+        'view_count': 12345
+    }
+
+def test_braces_and_semicolons_inside_strings_do_not_cut_the_json():
+    page = watch_page({
+        'videoDetails': {'title': "Deep dive: {code}; more };", 'author': "AWS Events"},
+        'microformat': {'playerMicroformatRenderer': {'uploadDate': "2024-12-04"}}
+    })
+    details = parse_watch_page(page)
+    assert details['title'] == "Deep dive: {code}; more };"
+    assert details['upload_date'] == "2024-12-04"
+
+def test_pages_without_a_player_response_fall_back_to_the_html():
+    page = ('<meta itemprop="datePublished" content="2024-12-05"><meta itemprop="duration" content="PT1H2M30S">'
+            '"title":"Fallback talk","author":"AWS Events","viewCount":"42"')
+    assert parse_watch_page(page) == {
+        'title': "Fallback talk",
+        'channel_name': "AWS Events",
+        'upload_date': "2024-12-05",
+        'duration': "1H 2M 30S",
+        'view_count': 42
+    }
+
+def test_missing_fields_are_placeholders():
+    details = parse_watch_page("<html>consent page</html>")
+    assert details['title'] == details['upload_date'] == "N/A"
+    assert details['view_count'] == 0
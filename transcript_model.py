@@ -0,0 +1,76 @@
+from array import array
+
+TRANSCRIPT_HEADER = "start - text\n"
+
+def _entry_fields(entry):
+    # youtube_transcript_api returns dicts from get_transcript and snippet objects from fetch
+    if isinstance(entry, dict):
+        return entry['start'], entry.get('duration', 0.0), entry['text']
+    return entry.start, entry.duration, entry.text
+
+def format_sentence_spans(sentence_spans):
+    """Serialize (start, end) sentence spans as one "start end" line (tenths of a second) per sentence.
+
+    Line n belongs to line n of the sentence text, so the two are stored side by side.
+    """
+    return "\n".join("%.1f %.1f" % (start, end) for start, end in sentence_spans)
+
+class Transcript:
+    """A transcript held as compact arrays of start times and durations plus a list of texts."""
+
+    def __init__(self):
+        self.starts = array('d')
+        self.durations = array('d')
+        self.texts = []
+
+    @classmethod
+    def from_entries(cls, entries):
+        transcript = cls()
+        for entry in entries:
+            start, duration, text = _entry_fields(entry)
+            transcript.starts.append(start)
+            transcript.durations.append(duration)
+            transcript.texts.append(text)
+        return transcript
+
+    def __len__(self):
+        return len(self.texts)
+
+    def render(self):
+        """Render the "mm:ss - text" transcript and the sentences in one linear pass.
+
+        Returns (transcript_data, transcript_sentences, sentence_spans) where sentence_spans
+        holds a (start, end) pair in seconds for every sentence.
+        """
+        lines = [TRANSCRIPT_HEADER]
+        add_line = lines.append
+        sentences = []
+        sentence_spans = []
+        current_sentence = []
+        sentence_start = 0.0
+
+        for start, duration, text in zip(self.starts, self.durations, self.texts):
+            minutes, remainder = divmod(start, 60)  # Full minutes and remaining seconds
+            seconds = int(remainder)
+            # Seconds used to be rounded to 2 decimals before truncating, which only matters
+            # when the fraction is .995 or more, so round only in that case
+            if remainder - seconds >= 0.995:
+                seconds = int(round(remainder, 2))
+            add_line('%02d:%02d - "%s"\n' % (minutes, seconds, text))
+
+            if not current_sentence:
+                sentence_start = start
+            current_sentence.append(text)
+
+            # A sentence ends with a period
+            if text.endswith("."):
+                sentences.append(" ".join(current_sentence).replace("\n", " "))
+                sentence_spans.append((sentence_start, start + duration))
+                current_sentence = []
+
+        # Keep any remaining sentence if there's no period at the end
+        if current_sentence:
+            sentences.append(" ".join(current_sentence).replace("\n", " "))
+            sentence_spans.append((sentence_start, self.starts[-1] + self.durations[-1]))
+
+        return "".join(lines), "\n".join(sentences), sentence_spans
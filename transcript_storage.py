@@ -0,0 +1,54 @@
+import json
+import zlib
+
+TRANSCRIPT_FIELDS = ('transcript', 'transcript_sentences', 'transcript_sentence_spans')
+
+# Values of the transcript_storage attribute
+STORAGE_ZLIB = 'zlib'  # Both transcript attributes hold zlib-compressed UTF-8 (DynamoDB binary)
+STORAGE_S3 = 's3'  # Both transcripts live in one zlib-compressed JSON object at transcript_s3_key
+
+def compress_text(text):
+    return zlib.compress(text.encode('utf-8'), 9)
+
+def decompress_text(value):
+    # boto3 returns DynamoDB binary attributes wrapped in boto3.dynamodb.types.Binary
+    data = getattr(value, 'value', value)
+    return zlib.decompress(bytes(data)).decode('utf-8')
+
+def encode_transcripts(video_id, transcript, transcript_sentences, s3_client, bucket, s3_prefix, s3_threshold,
+                       sentence_spans=''):
+    """Return (attributes_to_set, attributes_to_remove) for storing the transcripts.
+
+    The transcript, its sentences and their serialized time spans are compressed into
+    binary attributes. When the compressed size is above s3_threshold bytes they are
+    written to S3 instead and only a pointer is kept in the item, so long talks stay well
+    under DynamoDB's 400 KB item limit.
+    """
+    values = dict(zip(TRANSCRIPT_FIELDS, (transcript, transcript_sentences, sentence_spans)))
+    compressed = {field: compress_text(str(value)) for field, value in values.items()}
+
+    if sum(len(value) for value in compressed.values()) <= s3_threshold:
+        return dict(compressed, transcript_storage=STORAGE_ZLIB), ['transcript_s3_key']
+
+    s3_key = f"{s3_prefix}{video_id}.json.z"
+    body = zlib.compress(json.dumps({field: str(value) for field, value in values.items()}).encode('utf-8'), 9)
+    s3_client.put_object(Bucket=bucket, Key=s3_key, Body=body, ContentType='application/octet-stream')
+    return {'transcript_storage': STORAGE_S3, 'transcript_s3_key': s3_key}, list(TRANSCRIPT_FIELDS)
+
+def decode_transcripts(item, s3_client, bucket):
+    """Replace stored transcript attributes of a DynamoDB item with plain strings, in place.
+
+    Items written before compression (plain strings) are returned unchanged.
+    """
+    storage = item.get('transcript_storage')
+
+    if storage == STORAGE_ZLIB:
+        for field in TRANSCRIPT_FIELDS:
+            if field in item:
+                item[field] = decompress_text(item[field])
+    elif storage == STORAGE_S3 and item.get('transcript_s3_key'):
+        response = s3_client.get_object(Bucket=bucket, Key=item['transcript_s3_key'])
+        stored = json.loads(zlib.decompress(response['Body'].read()).decode('utf-8'))
+        for field in TRANSCRIPT_FIELDS:
+            item[field] = stored.get(field, '')
+    return item
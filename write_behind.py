@@ -0,0 +1,177 @@
+import collections
+import random
+import threading
+import time
+
+from metrics import metrics
+
+# Error codes of writes that can succeed when retried; anything else fails at once
+RETRYABLE_ERROR_CODES = (
+    'ProvisionedThroughputExceededException', 'ThrottlingException', 'RequestLimitExceeded',
+    'InternalServerError', 'ServiceUnavailable', 'TransactionConflictException'
+)
+# Exception classes (matched along the MRO) of connection problems and timeouts
+TRANSIENT_EXCEPTIONS = ('HTTPClientError', 'ConnectionError', 'TimeoutError')
+
+def is_retryable(error):
+    """Whether a failed write was throttled or hit a transient service or network error."""
+    response = getattr(error, 'response', None)
+    code = response.get('Error', {}).get('Code') if isinstance(response, dict) else None
+    if code:
+        return code in RETRYABLE_ERROR_CODES
+    return any(cls.__name__ in TRANSIENT_EXCEPTIONS for cls in type(error).__mro__)
+
+class WriteBehindBuffer:
+    """Queue DynamoDB item updates and apply them on background threads.
+
+    Callers hand over an update and return immediately. Updates to the same key that are
+    still waiting are coalesced into one UpdateItem (later values win), at most one write
+    per key is in flight at a time, and throttled or transient failures are retried with
+    backoff (validation errors and the like fail at once). The buffer holds at most
+    max_pending keys; callers block beyond that, which keeps memory bounded. flush()
+    waits for everything queued so far, including the success callbacks, and reports the
+    failures.
+    """
+
+    def __init__(self, table, key_name='video_url', max_pending=1000, workers=4, max_attempts=5):
+        self.table = table
+        self.key_name = key_name
+        self.max_pending = max_pending
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.pending = {}  # key -> {'set': {...}, 'remove': set(), 'callbacks': [...]}
+        self.order = collections.deque()
+        self.in_flight = set()
+        self.failures = []
+        self.stats = {'queued': 0, 'coalesced': 0, 'written': 0, 'retries': 0, 'failed': 0}
+        self.condition = threading.Condition()
+        self.threads = []
+
+    def _start(self):
+        # Workers are started on first use so importing the tool doesn't spawn threads
+        if self.threads:
+            return
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"write-behind-{n}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def update(self, key, set_values, remove=(), on_success=None):
+        """Queue `SET set_values REMOVE remove` for the item with the given key."""
+        with self.condition:
+            self._start()
+            if key not in self.pending and len(self.pending) >= self.max_pending:
+                # The buffer is full: time how long the caller is held up by DynamoDB
+                start = time.perf_counter()
+                while key not in self.pending and len(self.pending) >= self.max_pending:
+                    self.condition.wait()
+                metrics.observe('write_behind_backpressure', time.perf_counter() - start)
+
+            entry = self.pending.get(key)
+            if entry is None:
+                entry = {'set': {}, 'remove': set(), 'callbacks': []}
+                self.pending[key] = entry
+                self.order.append(key)
+            else:
+                self.stats['coalesced'] += 1
+
+            entry['set'].update(set_values)
+            entry['remove'].difference_update(set_values)
+            entry['remove'].update(name for name in remove if name not in set_values)
+            for name in remove:
+                entry['set'].pop(name, None)
+            if on_success:
+                entry['callbacks'].append(on_success)
+            self.stats['queued'] += 1
+            self.condition.notify_all()
+
+    def _next(self):
+        # Take the oldest key that doesn't already have a write in flight
+        for key in self.order:
+            if key not in self.in_flight:
+                self.order.remove(key)
+                self.in_flight.add(key)
+                return key, self.pending.pop(key)
+        return None, None
+
+    def _run(self):
+        while True:
+            with self.condition:
+                key, entry = self._next()
+                while key is None:
+                    self.condition.wait()
+                    key, entry = self._next()
+                self.condition.notify_all()
+
+            error = self._write(key, entry)
+
+            # Callbacks run while the key still counts as in flight, so flush() waits for them
+            if error is None:
+                for callback in entry['callbacks']:
+                    try:
+                        callback()
+                    except Exception as e:
+                        print(f"Error in write callback for {key}: {e}")
+
+            with self.condition:
+                self.in_flight.discard(key)
+                if error is None:
+                    self.stats['written'] += 1
+                else:
+                    self.stats['failed'] += 1
+                    self.failures.append((key, error))
+                self.condition.notify_all()
+
+    def _write(self, key, entry):
+        names = {}
+        values = {}
+        set_parts = []
+        for n, (name, value) in enumerate(entry['set'].items()):
+            names[f"#s{n}"] = name
+            values[f":s{n}"] = value
+            set_parts.append(f"#s{n} = :s{n}")
+        remove_parts = []
+        for n, name in enumerate(entry['remove']):
+            names[f"#r{n}"] = name
+            remove_parts.append(f"#r{n}")
+
+        update_expression = ""
+        if set_parts:
+            update_expression += "SET " + ", ".join(set_parts)
+        if remove_parts:
+            update_expression += " REMOVE " + ", ".join(remove_parts)
+        request = {
+            'Key': {self.key_name: key},
+            'UpdateExpression': update_expression.strip(),
+            'ExpressionAttributeNames': names
+        }
+        if values:
+            request['ExpressionAttributeValues'] = values
+
+        for attempt in range(self.max_attempts):
+            try:
+                self.table.update_item(**request)
+                return None
+            except Exception as e:
+                if not is_retryable(e):
+                    print(f"Error writing {key} to DynamoDB (not retried): {e}")
+                    return str(e)
+                if attempt + 1 == self.max_attempts:
+                    return str(e)
+                with self.condition:
+                    self.stats['retries'] += 1
+                metrics.increment('retries', component='write_behind')
+                time.sleep(min(2 ** attempt * 0.2, 10) + random.uniform(0, 0.2))
+
+    def flush(self):
+        """Wait until every queued update is written; return and clear the failures so far."""
+        with self.condition:
+            while self.pending or self.in_flight:
+                self.condition.wait()
+            failures, self.failures = self.failures, []
+
+        for key, error in failures:
+            print(f"Error writing {key} to DynamoDB: {error}")
+        print(f"DynamoDB writes: {self.stats['written']} written, {self.stats['coalesced']} coalesced, "
+              f"{self.stats['retries']} retries, {len(failures)} failed since last flush")
+        return failures
@@ -0,0 +1,133 @@
+import gzip
+import http.client
+import threading
+import zlib
+from urllib.parse import urlsplit
+
+from metrics import metrics
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive'
+}
+
+# Errors that mean a pooled keep-alive connection went stale and the request can be resent
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+class Response:
+    """A fully read HTTP response with its body already decompressed."""
+
+    def __init__(self, status, headers, content):
+        self.status = status
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+def decode_body(content, encoding):
+    """Undo gzip/deflate content encoding."""
+    if encoding == 'gzip':
+        return gzip.decompress(content)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(content)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(content, -zlib.MAX_WBITS)
+    return content
+
+class HTTPConnectionPool:
+    """A bounded, thread-safe pool of persistent HTTPS connections to one host.
+
+    Callers borrow an idle keep-alive connection (or open a new one while fewer than
+    max_connections exist), and return it after the response is fully read, so each
+    TCP+TLS handshake is paid once per connection instead of once per request.
+    """
+
+    def __init__(self, host, max_connections=16, timeout=30):
+        self.host = host
+        self.timeout = timeout
+        self.idle = []
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.stats = {'requests': 0, 'connections_opened': 0, 'reconnects': 0}
+
+    def _get_connection(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop()
+            self.stats['connections_opened'] += 1
+        return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+
+    def _put_connection(self, conn):
+        with self.lock:
+            self.idle.append(conn)
+
+    def request(self, method, path, body=None, headers=None, timeout=None):
+        """Send a request on a pooled connection and return a Response."""
+        if path.startswith('http'):
+            parts = urlsplit(path)
+            path = parts.path + (f"?{parts.query}" if parts.query else "")
+        request_headers = dict(DEFAULT_HEADERS)
+        request_headers.update(headers or {})
+
+        with metrics.timer('http_request', host=self.host, method=method):
+            response = self._send(method, path, body, request_headers, timeout)
+        if response.status == 429:
+            metrics.increment('throttles', service='youtube', operation=method)
+        elif response.status >= 400:
+            metrics.increment('http_errors', host=self.host, status=response.status)
+        return response
+
+    def _send(self, method, path, body, request_headers, timeout):
+        with self.slots:
+            conn = self._get_connection()
+            for attempt in range(2):
+                try:
+                    conn.timeout = timeout or self.timeout
+                    if conn.sock is not None:
+                        conn.sock.settimeout(conn.timeout)
+                    conn.request(method, path, body, request_headers)
+                    response = conn.getresponse()
+                    content = response.read()
+                    break
+                except STALE_CONNECTION_ERRORS:
+                    # The server closed an idle connection; retry once on a fresh one
+                    conn.close()
+                    if attempt:
+                        raise
+                    with self.lock:
+                        self.stats['reconnects'] += 1
+                    metrics.increment('retries', component='http_reconnect')
+                    conn = http.client.HTTPSConnection(self.host, timeout=self.timeout)
+                except Exception:
+                    conn.close()
+                    raise
+
+            response_headers = {name.lower(): value for name, value in response.getheaders()}
+            if response_headers.get('connection', '').lower() == 'close':
+                conn.close()
+            else:
+                self._put_connection(conn)
+
+        with self.lock:
+            self.stats['requests'] += 1
+        content = decode_body(content, response_headers.get('content-encoding', '').lower())
+        return Response(response.status, response_headers, content)
+
+    def get(self, path, headers=None, timeout=None):
+        return self.request("GET", path, headers=headers, timeout=timeout)
+
+    def post(self, path, body, headers=None, timeout=None):
+        return self.request("POST", path, body=body, headers=headers, timeout=timeout)
+
+    def close(self):
+        """Close every idle connection."""
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for conn in idle:
+            conn.close()
@@ -0,0 +1,95 @@
+import json
+import re
+
+# Matches the start of the ytInitialData assignment in its different spellings
+INITIAL_DATA_PATTERN = re.compile(r'(?:var\s+ytInitialData|window\["ytInitialData"\]|ytInitialData)\s*=\s*')
+
+_decoder = json.JSONDecoder()
+
+def extract_initial_data(html_content, pattern=INITIAL_DATA_PATTERN):
+    """Return the ytInitialData object embedded in a YouTube page, or None.
+
+    The assignment is located once and exactly one JSON value is decoded from that offset
+    with raw_decode, so the scan is linear and a '};' inside a string can't cut the JSON short.
+    """
+    for match in pattern.finditer(html_content):
+        start = match.end()
+        if html_content.startswith('{', start):
+            try:
+                return _decoder.raw_decode(html_content, start)[0]
+            except json.JSONDecodeError:
+                return None
+    return None
+
+# Matches the start of the ytInitialPlayerResponse assignment on a watch page
+PLAYER_RESPONSE_PATTERN = re.compile(r'(?:var\s+ytInitialPlayerResponse|window\["ytInitialPlayerResponse"\]|ytInitialPlayerResponse)\s*=\s*')
+
+# Fallback for pages without a player response: one alternation instead of a regex per field
+WATCH_PAGE_FIELDS_PATTERN = re.compile(
+    r'"title":"(?P<title>[^"]+)"'
+    r'|"author":"(?P<author>[^"]+)"'
+    r'|"viewCount":"(?P<view_count>\d+)"'
+    r'|<meta itemprop="datePublished" content="(?P<date_published>[^"]+)">'
+    r'|<meta itemprop="duration" content="(?P<duration>[^"]+)">'
+)
+
+def format_duration(length_seconds):
+    """Format a length in seconds the way YouTube's ISO duration was shown, e.g. '63M 30S'."""
+    minutes, seconds = divmod(int(length_seconds), 60)
+    return f"{minutes}M {seconds}S"
+
+def format_iso_duration(duration):
+    """Format an ISO 8601 duration such as PT1H2M30S as '1H 2M 30S'."""
+    match = re.match(r"PT(\d+H)?(\d+M)?(\d+S)?", duration)
+    if not match:
+        return "N/A"
+    return " ".join(part for part in match.groups() if part) or "N/A"
+
+def parse_watch_page(html_content):
+    """Extract title, channel, upload date, duration and view count from a watch page.
+
+    The embedded player response is decoded once and read for all fields. Pages without
+    one fall back to a single regex pass over the HTML.
+    """
+    record = {
+        'title': "N/A",
+        'channel_name': "N/A",
+        'upload_date': "N/A",
+        'duration': "N/A",
+        'view_count': 0
+    }
+
+    player_response = extract_initial_data(html_content, PLAYER_RESPONSE_PATTERN)
+    if player_response:
+        details = player_response.get('videoDetails', {})
+        microformat = player_response.get('microformat', {}).get('playerMicroformatRenderer', {})
+        record['title'] = details.get('title') or record['title']
+        record['channel_name'] = details.get('author') or microformat.get('ownerChannelName') or record['channel_name']
+        record['upload_date'] = microformat.get('publishDate') or microformat.get('uploadDate') or record['upload_date']
+        if details.get('lengthSeconds'):
+            record['duration'] = format_duration(details['lengthSeconds'])
+        if str(details.get('viewCount', '')).isdigit():
+            record['view_count'] = int(details['viewCount'])
+        if record['title'] != "N/A" and record['upload_date'] != "N/A":
+            return record
+
+    # Keep the first occurrence of every field, stopping once all of them are found
+    found = {}
+    for match in WATCH_PAGE_FIELDS_PATTERN.finditer(html_content):
+        for name, value in match.groupdict().items():
+            if value is not None and name not in found:
+                found[name] = value
+        if len(found) == 5:
+            break
+
+    if record['title'] == "N/A":
+        record['title'] = found.get('title', "N/A")
+    if record['channel_name'] == "N/A":
+        record['channel_name'] = found.get('author', "N/A")
+    if record['upload_date'] == "N/A":
+        record['upload_date'] = found.get('date_published', "N/A")
+    if record['duration'] == "N/A" and 'duration' in found:
+        record['duration'] = format_iso_duration(found['duration'])
+    if not record['view_count'] and 'view_count' in found:
+        record['view_count'] = int(found['view_count'])
+    return record